@@ -1,11 +1,12 @@
+import argparse
 from sieg.SiegApiHandler import *
 from utils.functions import *
 
 
-output_dir = os.path.join(
-            os.path.join(os.getcwd(), "temp")
-        )
-#resultado = GerenciadorArquivos.listar_arquivos_by_path(output_dir)
+# Diretório temp/ no diretório de trabalho, calculado uma única vez; as pastas
+# são criadas pelo SiegApiHandler à medida que os downloads são gravados
+TEMP_DIR = os.path.join(os.getcwd(), "temp")
+#resultado = GerenciadorArquivos.listar_arquivos_by_path(TEMP_DIR)
 
 #print(resultado)
 
@@ -18,19 +19,27 @@ output_dir = os.path.join(
 
 #download_xml_by_sieg(datetime.now() - timedelta(days=3), datetime.now() - timedelta(days=3))
 
-api_handler = SiegApiHandler()
-data_inicio = datetime(2024, 12, 9)
-data_fim = datetime(2024, 12, 10)
 
-#api_handler.download_xmls(data_inicio, data_fim)
+def parse_args() -> argparse.Namespace:
+    """
+    Lê o período de download da linha de comando.
+
+    Datas não informadas são obtidas das variáveis de ambiente DATA_INICIO e
+    DATA_FIM (formato AAAA-MM-DD); na ausência delas, usa o dia anterior.
+    """
+    ontem = (datetime.now() - timedelta(days=1)).date().isoformat()
+    parser = argparse.ArgumentParser(description="Download de documentos fiscais do Sieg Hub")
+    parser.add_argument("--from", dest="data_inicio", type=datetime.fromisoformat,
+                        default=os.getenv("DATA_INICIO", ontem), help="Data inicial (AAAA-MM-DD)")
+    parser.add_argument("--to", dest="data_fim", type=datetime.fromisoformat,
+                        default=os.getenv("DATA_FIM", ontem), help="Data final (AAAA-MM-DD)")
+    return parser.parse_args()
 
 
 # Exemplo de uso
 if __name__ == "__main__":
+    args = parse_args()
     logging.info("Iniciando execução do script.")
-    api_handler = SiegApiHandler()
-    data_inicio = datetime(2025, 1, 1)
-    data_fim = datetime(2025, 2, 5)
-
-    api_handler.download_xmls(data_inicio, data_fim)
+    with SiegApiHandler(temp_dir=TEMP_DIR) as api_handler:
+        api_handler.download_xmls(args.data_inicio, args.data_fim)
     logging.info("Execução concluída.")
\ No newline at end of file
@@ -1,94 +1,400 @@
-import xml.etree.ElementTree as ET
+from lxml import etree
 import logging
 from datetime import datetime
-from typing import Dict, Optional, Any
+from typing import Any, BinaryIO, Callable, Dict, Iterable, Iterator, Optional, Tuple, Union
+from dataclasses import dataclass
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
 import os
-from pathlib import Path
-from utils.functions import StringUtils
+import stat
+import sys
+import threading
+import zipfile
+
+logger = logging.getLogger(__name__)
+
+# Namespaces dos documentos fiscais, criados uma única vez e compartilhados pelas instâncias.
+# As URIs são internadas: todas as tags Clark montadas a partir delas compartilham a mesma string
+NAMESPACES = {prefixo: sys.intern(uri) for prefixo, uri in {
+    'nfe': 'http://www.portalfiscal.inf.br/nfe',    # NF-e namespace
+    'nfse': 'http://www.abrasf.org.br/nfse.xsd',    # NFS-e namespace
+    'cte': 'http://www.portalfiscal.inf.br/cte',    # CT-e namespace
+    'mdfe': 'http://www.portalfiscal.inf.br/mdfe',  # MDF-e namespace
+    'ds': 'http://www.w3.org/2000/09/xmldsig#'
+}.items()}
+# Mapa reverso URI -> prefixo, para lookup direto em vez de varrer os valores
+PREFIXOS_POR_URI = {uri: prefixo for prefixo, uri in NAMESPACES.items()}
+
+NS_NFE = {'nfe': NAMESPACES['nfe']}
+NS_CTE = {'cte': NAMESPACES['cte']}
+NS_MDFE = {'mdfe': NAMESPACES['mdfe']}
+NS_NFSE = {'nfse': NAMESPACES['nfse']}
+
+
+
+def _tags_evento(uri: str) -> Dict[str, str]:
+    """
+    Monta os caminhos dos eventos de CT-e/MDF-e em notação Clark ({uri}tag).
+
+    Com a URI já interpolada nas tags, o find/findtext do lxml não precisa
+    resolver prefixos a cada chamada.
+    """
+    ns = '{' + uri + '}'
+    return {
+        'infEvento': f'.//{ns}infEvento',
+        'detEvento': f'.//{ns}detEvento',
+        'retEvento': f'.//{ns}retEventoCTe' if uri == NAMESPACES['cte'] else f'.//{ns}retEventoMDFe',
+        'chCTe': f'{ns}chCTe',
+        'chMDFe': f'{ns}chMDFe',
+        'tpEvento': f'{ns}tpEvento',
+        'nSeqEvento': f'{ns}nSeqEvento',
+        'dhEvento': f'{ns}dhEvento',
+        'cStat': f'.//{ns}cStat',
+        'xMotivo': f'.//{ns}xMotivo',
+        'nProt': f'.//{ns}nProt',
+        'dhRegEvento': f'.//{ns}dhRegEvento',
+        'MDFe': f'.//{ns}MDFe',
+        'nProtMDFe': f'{ns}nProt',
+        'dhRecbto': f'{ns}dhRecbto',
+    }
+
+
+# Caminhos dos eventos de CT-e e MDF-e, montados uma única vez
+TAGS_EVENTO_CTE = _tags_evento(NAMESPACES['cte'])
+TAGS_EVENTO_MDFE = _tags_evento(NAMESPACES['mdfe'])
+
+# Caminhos dos eventos de NF-e em notação Clark
+_NS_EVENTO_NFE = '{' + NAMESPACES['nfe'] + '}'
+TAG_EVENTO_NFE_CHAVE = f'.//{_NS_EVENTO_NFE}chNFe'
+TAG_EVENTO_NFE_DESCRICAO = f'.//{_NS_EVENTO_NFE}detEvento/{_NS_EVENTO_NFE}descEvento'
+TAG_EVENTO_NFE_PROTOCOLO = f'.//{_NS_EVENTO_NFE}infEvento/{_NS_EVENTO_NFE}nProt'
+TAG_EVENTO_NFE_DATA = f'.//{_NS_EVENTO_NFE}infEvento/{_NS_EVENTO_NFE}dhEvento'
+TAG_EVENTO_NFE_CNPJ = f'.//{_NS_EVENTO_NFE}infEvento/{_NS_EVENTO_NFE}CNPJ'
+
+# Tamanho máximo aceito para um XML de documento fiscal (10MB)
+TAMANHO_MAXIMO_XML = 10 * 1024 * 1024
+
+# Parsers do lxml, um par por thread: o mesmo parser não deve ser usado por
+# duas threads ao mesmo tempo (o SiegApiHandler faz o parse em um pool de threads)
+_parsers_thread = threading.local()
+
+
+def _criar_parser(**opcoes) -> etree.XMLParser:
+    """
+    Cria um parser do lxml para os documentos fiscais.
+
+    Descarta os espaços entre as tags, os comentários e as instruções de
+    processamento (árvore menor e mais rápida de percorrer), não tenta recuperar
+    XML inválido e nunca carrega DTDs, entidades externas ou qualquer recurso da rede.
+    """
+    return etree.XMLParser(
+        remove_blank_text=True, remove_comments=True, remove_pis=True,
+        recover=False, collect_ids=False, huge_tree=False,
+        resolve_entities=False, load_dtd=False, no_network=True, **opcoes
+    )
+
+
+def _parser_xml() -> etree.XMLParser:
+    """Parser da thread atual, que respeita o encoding declarado no XML."""
+    parser = getattr(_parsers_thread, 'xml', None)
+    if parser is None:
+        parser = _parsers_thread.xml = _criar_parser()
+    return parser
+
+
+def _parser_xml_utf8() -> etree.XMLParser:
+    """Parser da thread atual para XML recebido como str: os bytes são sempre UTF-8."""
+    parser = getattr(_parsers_thread, 'xml_utf8', None)
+    if parser is None:
+        parser = _parsers_thread.xml_utf8 = _criar_parser(encoding='utf-8')
+    return parser
+
+
+
+
+def _compilar_campos(uri: str, campos: Dict[str, str]) -> Dict[str, list]:
+    """Agrupa os caminhos por tag final, com os ancestrais esperados do mais próximo ao mais distante."""
+    alvos = {}
+    for campo, caminho in campos.items():
+        *ancestrais, tag = caminho.split('/')
+        ancestrais = tuple(sys.intern(f'{{{uri}}}{ancestral}') for ancestral in reversed(ancestrais))
+        alvos.setdefault(sys.intern(f'{{{uri}}}{tag}'), []).append((campo, ancestrais))
+    return alvos
+
+
+# Tipo do documento pelo nome local da tag raiz, conforme os schemas da SEFAZ/ABRASF
+TIPOS_POR_TAG = {
+    'procEventoNFe': 'procEventoNFe',
+    'procEventoCTe': 'procEventoCTe',
+    'procEventoMDFe': 'procEventoMDFe',
+    'evento': 'Evento',
+    'eventoProc': 'Evento',
+    'cteProc': 'CT-e',
+    'CTe': 'CT-e',
+    'mdfeProc': 'MDF-e',
+    'MDFe': 'MDF-e',
+    'CompNfse': 'NFS-e',
+    'Nfse': 'NFS-e',
+    'nfeProc': 'NF-e',
+    'NFe': 'NF-e'
+}
+
+TIPOS_POR_TAG_MINUSCULA = {tag.lower(): tipo for tag, tipo in TIPOS_POR_TAG.items()}
+
+# Fallback por sufixo para raízes fora do padrão (avaliado na ordem)
+TIPOS_POR_SUFIXO = {
+    'proceventonfe': 'procEventoNFe',
+    'proceventocte': 'procEventoCTe',
+    'proceventomdfe': 'procEventoMDFe',
+    'eventoproc': 'Evento',
+    'evento': 'Evento',
+    'cteproc': 'CT-e',
+    'cte': 'CT-e',
+    'mdfeproc': 'MDF-e',
+    'mdfe': 'MDF-e',
+    'compnfse': 'NFS-e',
+    'nfse': 'NFS-e',
+    'nfeproc': 'NF-e',
+    'nfe': 'NF-e'
+}
+
+# Campos do evento de NF-e, coletados em uma única passada por _processar_evento
+CAMPOS_EVENTO = _compilar_campos(NS_NFE['nfe'], {
+    'chave_acesso': 'chNFe',
+    'tipo_evento': 'tpEvento',
+    'descricao_evento': 'xEvento',
+    'data_evento': 'dhEvento',
+})
+
+# Campos do infEvento de um procEvento, na ordem em que entram no resultado
+CAMPOS_PROC_EVENTO = {
+    'chave_acesso': 'chNFe',
+    'tipo_evento': 'tpEvento',
+    'sequencia_evento': 'nSeqEvento',
+    'cnpj_emitente': 'CNPJ',
+    'data_evento': 'dhEvento',
+    'descricao_evento': 'xEvento',
+    'protocolo': 'nProt',
+}
+
+
+def _caminhos_proc_evento(ns: str) -> Dict[str, Any]:
+    """
+    Monta as consultas de _processar_proc_evento para um prefixo de namespace.
+
+    Os caminhos usam a notação Clark ({uri}tag), como em _tags_evento: o find
+    do lxml não precisa de mapa de prefixos nem resolvê-los a cada chamada.
+    """
+    uri = NAMESPACES[ns]
+    ns_clark = '{' + uri + '}'
+    return {
+        # Tags aceitas como elemento do evento, buscadas juntas em uma única passada
+        'tags_evento': tuple(sys.intern(f'{ns_clark}{tag}') for tag in ('evento', 'eventocte', 'eventomdf')),
+        'infEvento': f'.//{ns_clark}infEvento',
+        'retEvento': f'.//{ns_clark}retEvento',
+        'cStat': f'.//{ns_clark}cStat',
+        'xMotivo': f'.//{ns_clark}xMotivo',
+        # Campos do infEvento, coletados juntos em uma única passada
+        'campos': _compilar_campos(uri, CAMPOS_PROC_EVENTO),
+    }
+
+
+# Um conjunto por prefixo conhecido: o namespace do procEvento é resolvido em tempo de execução
+CAMINHOS_PROC_EVENTO = {ns: _caminhos_proc_evento(ns) for ns in NAMESPACES}
+
+
+@dataclass(frozen=True)
+class ConfigDocumento:
+    """Diferenças entre NF-e, CT-e e MDF-e usadas no parse comum dos três."""
+    campos: Dict[str, list]
+    prefixo_id: str
+    campos_destinatario: Tuple[str, ...]
+    destinatario_padrao: Optional[str]
+    campos_data_emissao: Tuple[str, ...] = ('dh_emissao',)
+
+
+# Campos extraídos de cada tipo de documento, no formato 'pai/filho' relativo a
+# qualquer nível da árvore (equivalente a './/pai/filho'). Compilados uma única vez
+# em um índice por tag, permitem coletar todos os campos em uma só passada.
+CONFIG_DOCUMENTOS = {
+    'NF-e': ConfigDocumento(
+        campos=_compilar_campos(NS_NFE['nfe'], {
+            'inf': 'infNFe',
+            'cnpj_emitente': 'emit/CNPJ',
+            'cnpj_destinatario': 'dest/CNPJ',
+            'cpf_destinatario': 'dest/CPF',
+            'dh_emissao': 'ide/dhEmi',
+            'd_emissao': 'ide/dEmi',
+            'protocolo': 'protNFe/infProt/nProt',
+        }),
+        prefixo_id='NFe',
+        campos_destinatario=('cnpj_destinatario', 'cpf_destinatario'),
+        destinatario_padrao="Não especificado",
+        campos_data_emissao=('dh_emissao', 'd_emissao'),
+    ),
+    'CT-e': ConfigDocumento(
+        campos=_compilar_campos(NS_CTE['cte'], {
+            'inf': 'infCte',
+            'cnpj_emitente': 'emit/CNPJ',
+            'cnpj_destinatario': 'dest/CNPJ',
+            'dh_emissao': 'ide/dhEmi',
+            'protocolo': 'protCTe/infProt/nProt',
+        }),
+        prefixo_id='CTe',
+        campos_destinatario=('cnpj_destinatario',),
+        destinatario_padrao=None,
+    ),
+    # MDF-e não tem destinatário direto: usa o RNTRC do modal rodoviário
+    'MDF-e': ConfigDocumento(
+        campos=_compilar_campos(NS_MDFE['mdfe'], {
+            'inf': 'infMDFe',
+            'cnpj_emitente': 'emit/CNPJ',
+            'rntrc': 'infModal/rodo/infANTT/RNTRC',
+            'dh_emissao': 'ide/dhEmi',
+            'protocolo': 'protMDFe/infProt/nProt',
+        }),
+        prefixo_id='MDFe',
+        campos_destinatario=('rntrc',),
+        destinatario_padrao="Não especificado",
+    ),
+}
+
+CAMPOS_NFSE = _compilar_campos(NS_NFSE['nfse'], {
+    'numero': 'InfNfse/Numero',
+    'cnpj_prestador': 'PrestadorServico/IdentificacaoPrestador/Cnpj',
+    'cnpj_tomador': 'TomadorServico/IdentificacaoTomador/CpfCnpj/Cnpj',
+    'data_emissao': 'InfNfse/DataEmissao',
+})
+
+
+def _coletar_campos(root: etree._Element, alvos: Dict[str, list]) -> Dict[str, etree._Element]:
+    """
+    Percorre a árvore uma única vez e retorna o primeiro elemento de cada campo.
+
+    Apenas as tags de interesse são visitadas (filtro feito pelo lxml em C); para
+    cada uma, a cadeia de ancestrais é conferida contra o caminho do campo.
+    """
+    encontrados = {}
+    total = sum(len(campos) for campos in alvos.values())
+    for elemento in root.iterdescendants(*alvos):
+        for campo, ancestrais in alvos[elemento.tag]:
+            if campo in encontrados:
+                continue
+            atual = elemento
+            for tag in ancestrais:
+                atual = atual.getparent()
+                if atual is None or atual.tag != tag:
+                    break
+            else:
+                encontrados[campo] = elemento
+        if len(encontrados) == total:
+            break
+    return encontrados
+
+
+@lru_cache(maxsize=8192)
+def _formatar_data_hora(valor: str) -> str:
+    """
+    Converte uma data/hora ISO 8601 do documento para 'AAAA-MM-DD HH:MM:SS'.
+
+    Em lotes, muitos documentos e eventos compartilham o mesmo instante; o
+    cache evita refazer a conversão para valores repetidos.
+    """
+    return datetime.fromisoformat(valor).strftime('%Y-%m-%d %H:%M:%S')
 
-class DocumentoFiscalParser:
-    def __init__(self):
-        self.namespaces = {
-            'nfe': 'http://www.portalfiscal.inf.br/nfe',    # NF-e namespace
-            'nfse': 'http://www.abrasf.org.br/nfse.xsd',    # NFS-e namespace
-            'cte': 'http://www.portalfiscal.inf.br/cte',    # CT-e namespace
-            'mdfe': 'http://www.portalfiscal.inf.br/mdfe',  # MDF-e namespace
-            'ds': 'http://www.w3.org/2000/09/xmldsig#'
-        }
-        self._setup_logging()
 
-    def _setup_logging(self) -> None:
-        """Configure logging with appropriate format and level."""
+def _texto(campos: Dict[str, etree._Element], campo: str) -> Optional[str]:
+    """Retorna o texto do elemento coletado para o campo, ou None."""
+    elemento = campos.get(campo)
+    return elemento.text if elemento is not None else None
+
+
+@lru_cache(maxsize=None)
+def _setup_logging() -> None:
+    """
+    Configure logging with appropriate format and level.
+
+    Runs only on the first parser instantiation; later calls hit the cache
+    and never touch the logging lock.
+    """
+    if not logging.getLogger().handlers:
         logging.basicConfig(
             level=logging.INFO,
             format='%(asctime)s - %(levelname)s - %(message)s'
         )
 
-    def ler_arquivo_xml(self, caminho_arquivo: str) -> Optional[str]:
+
+class DocumentoFiscalParser:
+    # Sem __dict__ por instância: o único estado é a referência aos mapas do módulo
+    __slots__ = ('namespaces', '_prefixos_por_uri')
+
+    def __init__(self):
+        self.namespaces = NAMESPACES
+        self._prefixos_por_uri = PREFIXOS_POR_URI
+        _setup_logging()
+
+    def ler_arquivo_xml(self, caminho_arquivo: str) -> Optional[bytes]:
             """
-            Lê um arquivo XML e retorna seu conteúdo como string.
+            Lê um arquivo XML e retorna seu conteúdo em bytes.
+
+            O encoding não é tratado aqui: o parser o identifica pela declaração
+            <?xml encoding="..."?> (ou pelo BOM) ao interpretar os bytes.
             
             Args:
                 caminho_arquivo: Caminho para o arquivo XML
                 
             Returns:
-                Optional[str]: Conteúdo do arquivo XML ou None em caso de erro
+                Optional[bytes]: Conteúdo do arquivo XML ou None em caso de erro
                 
             Raises:
                 FileNotFoundError: Se o arquivo não for encontrado
                 PermissionError: Se não houver permissão para ler o arquivo
-                UnicodeDecodeError: Se houver erro na decodificação do arquivo
             """
             try:
-                # Normaliza o caminho do arquivo
-                caminho = Path(caminho_arquivo).resolve()
-                
-                # Verifica se o arquivo existe
-                if not caminho.exists():
-                    raise FileNotFoundError(f"Arquivo não encontrado: {caminho}")
-                
-                # Verifica se é um arquivo
-                if not caminho.is_file():
-                    raise ValueError(f"O caminho especificado não é um arquivo: {caminho}")
-                
-                # Verifica se tem extensão .xml
-                if caminho.suffix.lower() != '.xml':
-                    raise ValueError(f"O arquivo não tem extensão .xml: {caminho}")
-                
-                # Verifica o tamanho do arquivo (evita arquivos muito grandes)
-                tamanho_max = 10 * 1024 * 1024  # 10MB
-                if caminho.stat().st_size > tamanho_max:
-                    raise ValueError(f"Arquivo muito grande. Tamanho máximo permitido: {tamanho_max/1024/1024}MB")
-                
-                # Tenta ler o arquivo com diferentes encodings
-                encodings = ['utf-8', 'utf-8-sig', 'latin1', 'iso-8859-1']
+                caminho = os.fspath(caminho_arquivo)
+                self._validar_arquivo_xml(caminho)
                 
-                for encoding in encodings:
-                    try:
-                        with open(caminho, 'r', encoding=encoding) as file:
-                            conteudo = file.read()
-                            logging.info(f"Arquivo XML lido com sucesso usando encoding {encoding}")
-                            return conteudo
-                    except UnicodeDecodeError:
-                        continue
-                
-                raise UnicodeDecodeError(
-                    "Não foi possível decodificar o arquivo com nenhum dos encodings suportados"
-                )
+                with open(caminho, 'rb') as file:
+                    conteudo = file.read()
+                logger.debug("Arquivo XML lido com sucesso")
+                return conteudo
                 
             except FileNotFoundError as e:
-                logging.error(f"Arquivo não encontrado: {e}")
+                logger.error("Arquivo não encontrado: %s", e)
                 raise
             except PermissionError as e:
-                logging.error(f"Erro de permissão ao ler o arquivo: {e}")
-                raise
-            except UnicodeDecodeError as e:
-                logging.error(f"Erro ao decodificar o arquivo: {e}")
+                logger.error("Erro de permissão ao ler o arquivo: %s", e)
                 raise
             except Exception as e:
-                logging.exception(f"Erro inesperado ao ler o arquivo XML: {e}")
+                logger.exception("Erro inesperado ao ler o arquivo XML: %s", e)
                 raise
 
+    def _validar_arquivo_xml(self, caminho: str) -> int:
+        """
+        Valida o arquivo XML antes da leitura e retorna o seu tamanho em bytes.
+
+        Raises:
+            FileNotFoundError: Se o arquivo não for encontrado
+            ValueError: Se não for um arquivo .xml ou exceder o tamanho máximo
+        """
+        # Uma única chamada ao sistema: existência, tipo e tamanho
+        # (levanta FileNotFoundError se o arquivo não existir)
+        info = os.stat(caminho)
+        
+        # Verifica se é um arquivo
+        if not stat.S_ISREG(info.st_mode):
+            raise ValueError(f"O caminho especificado não é um arquivo: {caminho}")
+        
+        # Verifica se tem extensão .xml
+        if not caminho.lower().endswith('.xml'):
+            raise ValueError(f"O arquivo não tem extensão .xml: {caminho}")
+        
+        # Verifica o tamanho do arquivo (evita arquivos muito grandes)
+        if info.st_size > TAMANHO_MAXIMO_XML:
+            raise ValueError(f"Arquivo muito grande. Tamanho máximo permitido: {TAMANHO_MAXIMO_XML/1024/1024}MB")
+
+        return info.st_size
+
     def parse_documento_fiscal_arquivo(self, caminho_arquivo: str) -> Dict[str, Any]:
         """
         Parse um documento fiscal a partir de um arquivo XML.
@@ -99,312 +405,216 @@ class DocumentoFiscalParser:
         Returns:
             Dict[str, Any]: Dicionário com os dados do documento fiscal ou erro
         """
-        logging.info(f"Iniciando o parse do arquivo: {caminho_arquivo}")
+        logger.debug("Iniciando o parse do arquivo: %s", caminho_arquivo)
         try:
-            xml_string = self.ler_arquivo_xml(caminho_arquivo)
-            if xml_string:
-                return self.parse_documento_fiscal_string(xml_string)
-            else:
+            caminho = os.fspath(caminho_arquivo)
+            if self._validar_arquivo_xml(caminho) == 0:
                 return {'erro': 'Não foi possível ler o conteúdo do arquivo XML'}
+
+            # O parser lê o arquivo em blocos, sem carregá-lo inteiro na memória
+            with open(caminho, 'rb') as arquivo:
+                return self._parse_documento(self._parse_xml_arquivo, arquivo)
                 
         except FileNotFoundError:
             return {'erro': f'Arquivo não encontrado: {caminho_arquivo}'}
         except PermissionError:
             return {'erro': f'Sem permissão para ler o arquivo: {caminho_arquivo}'}
-        except UnicodeDecodeError:
-            return {'erro': 'Erro ao decodificar o arquivo. Encoding não suportado.'}
         except Exception as e:
-            logging.exception(f"Erro ao processar o arquivo: {caminho_arquivo}")
+            logger.exception("Erro ao processar o arquivo: %s", caminho_arquivo)
             return {'erro': f'Erro ao processar o arquivo: {str(e)}'}
 
-    def parse_documento_fiscal_string(self, xml_string: str) -> Dict[str, Any]:
-        """Parse a fiscal document from an XML string."""
-        logging.info("Iniciando o parse de um documento fiscal a partir de uma string.")
+    def parse_documento_fiscal_zip(self, caminho_zip: str) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Parse dos documentos fiscais contidos em um arquivo ZIP.
+
+        O arquivo é aberto uma única vez e cada XML é lido direto da memória,
+        sem as chamadas ao sistema (stat/open) que seriam feitas por arquivo.
+
+        Args:
+            caminho_zip: Caminho para o arquivo ZIP
+
+        Yields:
+            Tuple[str, Dict[str, Any]]: Nome do XML no ZIP e o resultado do parse
+        """
+        with zipfile.ZipFile(caminho_zip) as arquivo_zip:
+            for info in arquivo_zip.infolist():
+                if info.is_dir() or not info.filename.lower().endswith('.xml'):
+                    continue
+                if info.file_size > TAMANHO_MAXIMO_XML:
+                    yield info.filename, {'erro': f'Arquivo muito grande. Tamanho máximo permitido: {TAMANHO_MAXIMO_XML/1024/1024}MB'}
+                    continue
+                yield info.filename, self.parse_documento_fiscal_bytes(arquivo_zip.read(info))
+
+    def parse_documento_fiscal_batch(self, caminhos: Iterable[str], workers: Optional[int] = None
+                                     ) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Parse de vários arquivos XML em paralelo, em processos separados.
+
+        Cada processo do pool cria um único parser na inicialização e o reutiliza
+        em todos os arquivos que receber, junto com as XPaths já compiladas.
+
+        Args:
+            caminhos: Caminhos dos arquivos XML
+            workers: Quantidade de processos. Padrão: os.cpu_count()
+
+        Yields:
+            Tuple[str, Dict[str, Any]]: Caminho do arquivo e o resultado do parse, na ordem de entrada
+        """
+        caminhos = list(caminhos)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+            yield from zip(caminhos, executor.map(_parse_arquivo_worker, caminhos, chunksize=32))
+
+    def parse_documento_fiscal_bytes(self, conteudo: bytes) -> Dict[str, Any]:
+        """Parse a fiscal document from raw XML bytes, honouring the declared encoding."""
+        logger.debug("Iniciando o parse de um documento fiscal a partir de bytes.")
+        return self._parse_documento(self._parse_xml, conteudo)
+
+    def parse_documento_fiscal_string(self, xml_string: Union[str, bytes]) -> Dict[str, Any]:
+        """Parse a fiscal document from an XML string or raw bytes."""
+        logger.debug("Iniciando o parse de um documento fiscal a partir de uma string.")
+        if not isinstance(xml_string, str):
+            return self._parse_documento(self._parse_xml, xml_string)
+
+        # O lxml não aceita str com declaração de encoding; entrega os bytes em UTF-8
         try:
-            root = self._parse_xml(xml_string)
+            conteudo = xml_string.encode('utf-8')
+        except UnicodeEncodeError as e:
+            logger.error("Erro ao interpretar o XML: %s", e)
+            return {'erro': 'Conteúdo fornecido não é um XML válido'}
+        return self._parse_documento(self._parse_xml_utf8, conteudo)
+
+    def _parse_documento(self, parse: Callable[[Any], etree._Element], origem: Any) -> Dict[str, Any]:
+        """
+        Interpreta o XML com a função de parse informada e processa o documento fiscal.
+
+        Args:
+            parse: Função que recebe a origem e retorna o elemento raiz
+            origem: Conteúdo XML em bytes ou arquivo aberto, conforme a função
+        """
+        try:
+            root = parse(origem)
             tipo_documento = self._identificar_tipo_documento(root)
             
-            processors = {
-                'NF-e': self.parse_nfe,
-                'CT-e': self.parse_cte,  # Similar structure to NF-e
-                'MDF-e': self.parse_mdfe, # Similar structure to NF-e
-                'NFS-e': self.parse_nfse,
-                'Evento': self._processar_evento,
-                'procEventoNFe': self._processar_proc_evento,
-                'procEventoCTe': self._processar_proc_eventoCTeMDFe,
-                'procEventoMDFe': self._processar_proc_eventoCTeMDFe
-            }
-            
-            processor = processors.get(tipo_documento)
+            processor = _PROCESSADORES.get(tipo_documento)
             if processor:
-                logging.info(f"Documento identificado como {tipo_documento}.")
-                return processor(root, tipo_documento)
+                logger.debug("Documento identificado como %s.", tipo_documento)
+                return processor(self, root, tipo_documento)
             else:
-                logging.warning("Tipo de documento fiscal não identificado.")
+                logger.warning("Tipo de documento fiscal não identificado.")
                 return {'erro': 'Tipo de documento fiscal não identificado'}
 
-        except ET.ParseError as e:
-            logging.error(f"Erro ao interpretar o XML: {str(e)}")
+        except etree.ParseError as e:
+            logger.error("Erro ao interpretar o XML: %s", e)
             return {'erro': 'Conteúdo fornecido não é um XML válido'}
         except Exception as e:
-            logging.exception("Erro inesperado durante o parse do documento fiscal.")
+            logger.exception("Erro inesperado durante o parse do documento fiscal.")
             return {'erro': f'Erro inesperado: {str(e)}'}
 
-    def _parse_xml(self, xml_string: str) -> ET.Element:
-        """Parse XML string into ElementTree."""
-        logging.debug("Interpretando o XML fornecido.")
+    def _parse_xml(self, xml_string: bytes) -> etree._Element:
+        """Parse XML bytes into an lxml element tree."""
+        logger.debug("Interpretando o XML fornecido.")
+
+        # Bytes vão direto ao parser, que respeita o encoding declarado no XML
+        return etree.fromstring(xml_string, _parser_xml())
 
-        #xml_str = StringUtils.remover_caracteres(xml_string,'<','>')
+    def _parse_xml_utf8(self, conteudo: bytes) -> etree._Element:
+        """Parse UTF-8 encoded XML bytes, ignoring the declared encoding."""
+        logger.debug("Interpretando o XML fornecido.")
+        return etree.fromstring(conteudo, _parser_xml_utf8())
 
-        return ET.fromstring(xml_string)
+    def _parse_xml_arquivo(self, arquivo: BinaryIO) -> etree._Element:
+        """Parse an XML file opened in binary mode into an lxml element tree."""
+        logger.debug("Interpretando o arquivo XML fornecido.")
+        return etree.parse(arquivo, _parser_xml()).getroot()
 
-    def _identificar_tipo_documento(self, root: ET.Element) -> Optional[str]:
+    def _identificar_tipo_documento(self, root: etree._Element) -> Optional[str]:
         """Identify the type of fiscal document."""
-        logging.debug("Identificando o tipo de documento fiscal.")
+        logger.debug("Identificando o tipo de documento fiscal.")
+
+        # Caso comum: raiz com o nome definido nos schemas, uma única consulta
+        local = root.tag.rpartition('}')[2]
+        tipo = TIPOS_POR_TAG.get(local)
+        if tipo is not None:
+            return tipo
+
+        # Mesmo nome com outra grafia de maiúsculas/minúsculas
+        tipo = TIPOS_POR_TAG_MINUSCULA.get(local.lower())
+        if tipo is not None:
+            return tipo
+
+        # Demais raízes: busca pelo sufixo, sem diferenciar maiúsculas
         tag = root.tag.lower()
-        
-        tipo_mapping = {
-            'proceventonfe': 'procEventoNFe',
-            'proceventocte': 'procEventoCTe',
-            'proceventomdfe': 'procEventoMDFe',
-            'eventoproc': 'Evento',
-            'evento': 'Evento',
-            'cteproc': 'CT-e',
-            'cte': 'CT-e',
-            'mdfeproc': 'MDF-e',
-            'mdfe': 'MDF-e',
-            'compnfse': 'NFS-e',
-            'nfse': 'NFS-e',
-            'nfeproc': 'NF-e',
-            'nfe': 'NF-e'
-        }
-        
-        for suffix, doc_type in tipo_mapping.items():
+        for suffix, doc_type in TIPOS_POR_SUFIXO.items():
             if tag.endswith(suffix):
                 return doc_type
                 
-        logging.warning(f"Tipo de documento não identificado para a tag: {tag}")
+        logger.warning("Tipo de documento não identificado para a tag: %s", tag)
         return None
 
-        def _processar_nfe(self, root: ET.Element, tipo_documento: str) -> Dict[str, Any]:
-            """Process NF-e, CT-e, or MDF-e documents."""
-            logging.debug(f"Processando {tipo_documento}.")
-            try:
-                # Define namespace based on document type
-                if tipo_documento == 'NF-e':
-                    ns = 'nfe'
-                    uri = 'http://www.portalfiscal.inf.br/nfe'
-                elif tipo_documento == 'CT-e':
-                    ns = 'cte'
-                    uri = 'http://www.portalfiscal.inf.br/cte'
-                elif tipo_documento == 'MDF-e':
-                    ns = 'mdfe'
-                    uri = 'http://www.portalfiscal.inf.br/mdfe'
-                else:
-                    raise ValueError("Tipo de documento inválido")
-
-                # Namespace mapping
-                namespaces = {ns: uri}
-
-                # Extract emitter CNPJ
-                cnpj_emitente = root.find(f'.//{ns}:emit/{ns}:CNPJ', namespaces)
-                if cnpj_emitente is None:
-                    raise ValueError(f"CNPJ do emitente não encontrado no {tipo_documento}")
-
-                # Extract recipient identification
-                destinatario = self._extrair_destinatario(root, ns)
-                if destinatario is None:
-                    raise ValueError(f"Destinatário não encontrado no {tipo_documento}")
-
-                # Extract access key and emission date
-                info_tag = f'inf{tipo_documento.replace("-", "")}'
-                info_element = root.find(f'.//{ns}:{info_tag}', namespaces)
-                if info_element is None or 'Id' not in info_element.attrib:
-                    raise ValueError(f"Chave de acesso não encontrada no {tipo_documento}")
-                
-                chave_acesso = info_element.get('Id').replace(tipo_documento.replace("-", ""), '')
-
-                data_emissao = root.find(f'.//{ns}:ide/{ns}:dhEmi', namespaces)
-                if data_emissao is None:
-                    raise ValueError(f"Data de emissão não encontrada no {tipo_documento}")
-
-                return self._formatar_saida(tipo_documento, cnpj_emitente.text, destinatario, chave_acesso, data_emissao.text)
-
-            except AttributeError as e:
-                logging.error(f"Erro ao processar {tipo_documento}: Estrutura inválida - {str(e)}")
-                return {'erro': f'Estrutura do {tipo_documento} inválida'}
-            except ValueError as e:
-                logging.error(f"Erro ao processar {tipo_documento}: {str(e)}")
-                return {'erro': str(e)}
-            except Exception as e:
-                logging.exception(f"Erro inesperado ao processar {tipo_documento}")
-                return {'erro': f'Erro inesperado ao processar {tipo_documento}: {str(e)}'}
-
-    def parse_cte(self, root: ET.Element, tipo_documento: str) -> Dict[str, Any]:
+    def parse_cte(self, root: etree._Element, tipo_documento: str) -> Dict[str, Any]:
         """
         Faz o parse do XML de CT-e e devolve os dados em um dicionário.
-        :param xml_path: Caminho do arquivo XML.
+        :param root: Elemento raiz do XML.
         :return: Dicionário com os dados do CT-e.
         """
-        try:
-            # Namespaces do XML
-            namespaces = {'cte': 'http://www.portalfiscal.inf.br/cte'}
-
-            # Carregar o XML
-            #tree = ET.parse(xml_path)
-            #root = tree.getroot()
-
-            # Definir tipo de documento
-            #tipo_documento = "CT-e"
-
-            # Extrair chave de acesso
-            inf_cte = root.find('.//cte:infCte', namespaces)
-            chave_acesso = inf_cte.attrib['Id'].replace("CTe", "") if inf_cte is not None else None
-
-            # Extrair CNPJ do emitente
-            cnpj_emitente = root.find('.//cte:emit/cte:CNPJ', namespaces)
-            cnpj_emitente_text = cnpj_emitente.text if cnpj_emitente is not None else None
-
-            # Extrair CNPJ do destinatário
-            destinatario = root.find('.//cte:dest/cte:CNPJ', namespaces)
-            destinatario_text = destinatario.text if destinatario is not None else None
+        return self._parse_documento_autorizado(root, tipo_documento, CONFIG_DOCUMENTOS['CT-e'])
 
-            # Extrair data de emissão
-            data_emissao = root.find('.//cte:ide/cte:dhEmi', namespaces)
-            data_emissao_text = data_emissao.text if data_emissao is not None else None
-
-            # Formatando data de emissão (opcional)
-            data_emissao_formatada = data_emissao_text.split('T')[0] if data_emissao_text else None
-
-            # Extrair protocolo, se existir
-            protocolo = root.find('.//cte:protCTe/cte:infProt/cte:nProt', namespaces)
-            protocolo_text = protocolo.text if protocolo is not None else None
-
-            # Montar o dicionário de saída
-            resultado = {
-                'tipo_documento': tipo_documento,
-                'chave_acesso': chave_acesso,
-                'cnpj_emitente': cnpj_emitente_text,
-                'destinatario': destinatario_text,
-                'data_emissao': data_emissao_formatada,
-                'protocolo': protocolo_text
-            }
-
-            logging.info("XML processado com sucesso.")
-            return resultado
-
-        except ET.ParseError as e:
-            logging.error(f"Erro ao parsear o XML: {e}")
-            return {'erro': 'Falha ao processar o XML'}
-        except Exception as e:
-            logging.exception(f"Erro inesperado: {e}")
-            return {'erro': f'Erro inesperado: {str(e)}'}
-
-    def parse_mdfe(self, root: ET.Element, tipo_documento: str) -> Dict[str, Any]:
+    def parse_mdfe(self, root: etree._Element, tipo_documento: str) -> Dict[str, Any]:
         """
         Faz o parse do XML de MDF-e e devolve os dados em um dicionário.
-        :param xml_path: Caminho do arquivo XML.
+        :param root: Elemento raiz do XML.
         :return: Dicionário com os dados do MDF-e.
         """
-        try:
-            # Namespaces do XML
-            namespaces = {'mdfe': 'http://www.portalfiscal.inf.br/mdfe'}
-
-            # Carregar o XML
-            #tree = ET.parse(xml_path)
-            #root = tree.getroot()
-
-            # Definir tipo de documento
-            #tipo_documento = "MDF-e"
-
-            # Extrair chave de acesso
-            inf_mdfe = root.find('.//mdfe:infMDFe', namespaces)
-            chave_acesso = inf_mdfe.attrib['Id'].replace("MDFe", "") if inf_mdfe is not None else None
-
-            # Extrair CNPJ do emitente
-            cnpj_emitente = root.find('.//mdfe:emit/mdfe:CNPJ', namespaces)
-            cnpj_emitente_text = cnpj_emitente.text if cnpj_emitente is not None else None
-
-            # Extrair destinatário (remetente ou contratante, conforme MDF-e não tem destinatário direto)
-            contratante = root.find('.//mdfe:infModal/mdfe:rodo/mdfe:infANTT/mdfe:RNTRC', namespaces)
-            destinatario_text = contratante.text if contratante is not None else "Não especificado"
-
-            # Extrair data de emissão
-            data_emissao = root.find('.//mdfe:ide/mdfe:dhEmi', namespaces)
-            data_emissao_text = data_emissao.text if data_emissao is not None else None
-
-            # Formatando data de emissão (opcional)
-            data_emissao_formatada = data_emissao_text.split('T')[0] if data_emissao_text else None
+        return self._parse_documento_autorizado(root, tipo_documento, CONFIG_DOCUMENTOS['MDF-e'])
 
-            # Extrair protocolo, se existir
-            protocolo = root.find('.//mdfe:protMDFe/mdfe:infProt/mdfe:nProt', namespaces)
-            protocolo_text = protocolo.text if protocolo is not None else None
-
-            # Montar o dicionário de saída
-            resultado = {
-                'tipo_documento': tipo_documento,
-                'chave_acesso': chave_acesso,
-                'cnpj_emitente': cnpj_emitente_text,
-                'destinatario': destinatario_text,
-                'data_emissao': data_emissao_formatada,
-                'protocolo': protocolo_text
-            }
-
-            logging.info("XML MDF-e processado com sucesso.")
-            return resultado
-
-        except ET.ParseError as e:
-            logging.error(f"Erro ao parsear o XML: {e}")
-            return {'erro': 'Falha ao processar o XML'}
-        except Exception as e:
-            logging.exception(f"Erro inesperado: {e}")
-            return {'erro': f'Erro inesperado: {str(e)}'}
-
-    def parse_nfe(self, root: ET.Element, tipo_documento: str) -> Dict[str, Any]:
+    def parse_nfe(self, root: etree._Element, tipo_documento: str) -> Dict[str, Any]:
         """
         Faz o parse do XML de NF-e e devolve os dados em um dicionário.
-        :param xml_path: Caminho do arquivo XML.
+        :param root: Elemento raiz do XML.
         :return: Dicionário com os dados da NF-e.
         """
-        try:
-            # Namespaces do XML da NF-e
-            namespaces = {'nfe': 'http://www.portalfiscal.inf.br/nfe'}
+        return self._parse_documento_autorizado(root, tipo_documento, CONFIG_DOCUMENTOS['NF-e'])
 
-            # Carregar o XML
-            #tree = ET.parse(xml_path)
-            #root = tree.getroot()
-
-            # Definir tipo de documento
-            #tipo_documento = "NF-e"
+    def _parse_documento_autorizado(self, root: etree._Element, tipo_documento: str,
+                                    config: ConfigDocumento) -> Dict[str, Any]:
+        """
+        Faz o parse de NF-e, CT-e ou MDF-e conforme a configuração do tipo.
+        :param root: Elemento raiz do XML.
+        :param config: Configuração do tipo de documento (CONFIG_DOCUMENTOS).
+        :return: Dicionário com os dados do documento.
+        """
+        try:
+            # Coletar os campos do documento em uma única passada pela árvore
+            campos = _coletar_campos(root, config.campos)
 
             # Extrair chave de acesso
-            inf_nfe = root.find('.//nfe:infNFe', namespaces)
-            chave_acesso = inf_nfe.attrib['Id'].replace("NFe", "") if inf_nfe is not None else None
+            inf = campos.get('inf')
+            chave_acesso = inf.attrib['Id'].removeprefix(config.prefixo_id) if inf is not None else None
 
             # Extrair CNPJ do emitente
-            cnpj_emitente = root.find('.//nfe:emit/nfe:CNPJ', namespaces)
-            cnpj_emitente_text = cnpj_emitente.text if cnpj_emitente is not None else None
-
-            # Extrair CNPJ do destinatário
-            cnpj_destinatario = root.find('.//nfe:dest/nfe:CNPJ', namespaces)
-            cpf_destinatario = root.find('.//nfe:dest/nfe:CPF', namespaces)
-            destinatario_text = cnpj_destinatario.text if cnpj_destinatario is not None else (
-                cpf_destinatario.text if cpf_destinatario is not None else "Não especificado"
-            )
-
-            # Extrair data de emissão
-            data_emissao = root.find('.//nfe:ide/nfe:dhEmi', namespaces)
-            if data_emissao is None:
-                # Em versões antigas da NF-e, use 'dEmi' como fallback
-                data_emissao = root.find('.//nfe:ide/nfe:dEmi', namespaces)
-            data_emissao_text = data_emissao.text if data_emissao is not None else None
+            cnpj_emitente_text = _texto(campos, 'cnpj_emitente')
+
+            # Extrair destinatário (primeiro campo presente, na ordem de preferência)
+            destinatario_text = config.destinatario_padrao
+            for campo in config.campos_destinatario:
+                destinatario = campos.get(campo)
+                if destinatario is not None:
+                    destinatario_text = destinatario.text
+                    break
+
+            # Extrair data de emissão (em versões antigas da NF-e, 'dEmi' como fallback)
+            data_emissao_text = None
+            for campo in config.campos_data_emissao:
+                data_emissao = campos.get(campo)
+                if data_emissao is not None:
+                    data_emissao_text = data_emissao.text
+                    break
 
             # Formatando data de emissão (opcional)
-            data_emissao_formatada = data_emissao_text.split('T')[0] if data_emissao_text and 'T' in data_emissao_text else data_emissao_text
+            data_emissao_formatada = data_emissao_text.partition('T')[0] if data_emissao_text else None
 
             # Extrair protocolo, se existir
-            protocolo = root.find('.//nfe:protNFe/nfe:infProt/nfe:nProt', namespaces)
-            protocolo_text = protocolo.text if protocolo is not None else None
+            protocolo_text = _texto(campos, 'protocolo')
 
             # Montar o dicionário de saída
             resultado = {
@@ -416,26 +626,23 @@ class DocumentoFiscalParser:
                 'protocolo': protocolo_text
             }
 
-            logging.info("XML NF-e processado com sucesso.")
+            logger.debug("XML %s processado com sucesso.", tipo_documento)
             return resultado
 
-        except ET.ParseError as e:
-            logging.error(f"Erro ao parsear o XML: {e}")
+        except etree.ParseError as e:
+            logger.error("Erro ao parsear o XML: %s", e)
             return {'erro': 'Falha ao processar o XML'}
         except Exception as e:
-            logging.exception(f"Erro inesperado: {e}")
+            logger.exception("Erro inesperado: %s", e)
             return {'erro': f'Erro inesperado: {str(e)}'}
 
-    def parse_evento_nfe(self, root: ET.Element, tipo_documento: str) -> Dict[str, Any]:
+    def parse_evento_nfe(self, root: etree._Element, tipo_documento: str) -> Dict[str, Any]:
         """
         Faz o parse do XML de eventos da NF-e e devolve os dados em um dicionário.
         :param xml_path: Caminho do arquivo XML.
         :return: Dicionário com os dados do evento da NF-e.
         """
         try:
-            # Namespaces do XML de eventos da NF-e
-            namespaces = {'nfe': 'http://www.portalfiscal.inf.br/nfe'}
-
             # Carregar o XML
             #tree = ET.parse(xml_path)
             #root = tree.getroot()
@@ -444,23 +651,23 @@ class DocumentoFiscalParser:
             #tipo_documento = "Evento NF-e"
 
             # Extrair chave de acesso
-            chave_acesso = root.find('.//nfe:chNFe', namespaces)
+            chave_acesso = root.find(TAG_EVENTO_NFE_CHAVE)
             chave_acesso_text = chave_acesso.text if chave_acesso is not None else None
 
             # Extrair tipo de evento
-            tp_evento = root.find('.//nfe:detEvento/nfe:descEvento', namespaces)
+            tp_evento = root.find(TAG_EVENTO_NFE_DESCRICAO)
             tipo_evento_text = tp_evento.text if tp_evento is not None else "Não especificado"
 
             # Extrair protocolo do evento
-            protocolo = root.find('.//nfe:infEvento/nfe:nProt', namespaces)
+            protocolo = root.find(TAG_EVENTO_NFE_PROTOCOLO)
             protocolo_text = protocolo.text if protocolo is not None else None
 
             # Extrair data/hora do evento
-            dh_evento = root.find('.//nfe:infEvento/nfe:dhEvento', namespaces)
+            dh_evento = root.find(TAG_EVENTO_NFE_DATA)
             data_evento_text = dh_evento.text if dh_evento is not None else None
 
             # Extrair CNPJ do emitente
-            cnpj_emitente = root.find('.//nfe:infEvento/nfe:CNPJ', namespaces)
+            cnpj_emitente = root.find(TAG_EVENTO_NFE_CNPJ)
             cnpj_emitente_text = cnpj_emitente.text if cnpj_emitente is not None else None
 
             # Montar o dicionário de saída
@@ -473,28 +680,23 @@ class DocumentoFiscalParser:
                 'protocolo': protocolo_text
             }
 
-            logging.info("XML de evento NF-e processado com sucesso.")
+            logger.debug("XML de evento NF-e processado com sucesso.")
             return resultado
 
-        except ET.ParseError as e:
-            logging.error(f"Erro ao parsear o XML: {e}")
+        except etree.ParseError as e:
+            logger.error("Erro ao parsear o XML: %s", e)
             return {'erro': 'Falha ao processar o XML'}
         except Exception as e:
-            logging.exception(f"Erro inesperado: {e}")
+            logger.exception("Erro inesperado: %s", e)
             return {'erro': f'Erro inesperado: {str(e)}'}
 
-    def parse_nfse(self, root: ET.Element, tipo_documento: str) -> Dict[str, Any]:
+    def parse_nfse(self, root: etree._Element, tipo_documento: str) -> Dict[str, Any]:
         """
         Faz o parse do XML de NFS-e e devolve os dados em um dicionário.
         :param xml_path: Caminho do arquivo XML.
         :return: Dicionário com os dados da NFS-e.
         """
         try:
-            # Namespaces do XML (adaptado para NFS-e)
-            namespaces = {
-                'nfse': 'http://www.abrasf.org.br/nfse.xsd'  # Namespace padrão de NFS-e (ajuste conforme necessário)
-            }
-
             # Carregar o XML
             #tree = ET.parse(xml_path)
             #root = tree.getroot()
@@ -502,28 +704,26 @@ class DocumentoFiscalParser:
             # Definir tipo de documento
             #tipo_documento = "NFS-e"
 
+            # Coletar os campos da NFS-e em uma única passada pela árvore
+            campos = _coletar_campos(root, CAMPOS_NFSE)
+
             # Extrair chave de acesso (identificador da NFS-e)
-            inf_nfse = root.find('.//nfse:InfNfse', namespaces)
-            chave_acesso = inf_nfse.find('.//nfse:Numero', namespaces).text if inf_nfse is not None else None
+            chave_acesso = _texto(campos, 'numero')
 
             # Extrair CNPJ do prestador
-            cnpj_prestador = root.find('.//nfse:PrestadorServico/nfse:IdentificacaoPrestador/nfse:Cnpj', namespaces)
-            cnpj_prestador_text = cnpj_prestador.text if cnpj_prestador is not None else None
+            cnpj_prestador_text = _texto(campos, 'cnpj_prestador')
 
             # Extrair CNPJ do tomador (destinatário)
-            cnpj_tomador = root.find('.//nfse:TomadorServico/nfse:IdentificacaoTomador/nfse:CpfCnpj/nfse:Cnpj', namespaces)
-            cnpj_tomador_text = cnpj_tomador.text if cnpj_tomador is not None else None
+            cnpj_tomador_text = _texto(campos, 'cnpj_tomador')
 
             # Extrair data de emissão
-            data_emissao = root.find('.//nfse:InfNfse/nfse:DataEmissao', namespaces)
-            data_emissao_text = data_emissao.text if data_emissao is not None else None
+            data_emissao_text = _texto(campos, 'data_emissao')
 
             # Formatando data de emissão (opcional)
-            data_emissao_formatada = data_emissao_text.split('T')[0] if data_emissao_text else None
+            data_emissao_formatada = data_emissao_text.partition('T')[0] if data_emissao_text else None
 
             # Extrair protocolo (número da NFS-e)
-            numero_nfse = root.find('.//nfse:InfNfse/nfse:Numero', namespaces)
-            protocolo_text = numero_nfse.text if numero_nfse is not None else None
+            protocolo_text = _texto(campos, 'numero')
 
             # Montar o dicionário de saída
             resultado = {
@@ -535,170 +735,42 @@ class DocumentoFiscalParser:
                 'protocolo': protocolo_text
             }
 
-            logging.info("XML NFS-e processado com sucesso.")
+            logger.debug("XML NFS-e processado com sucesso.")
             return resultado
 
-        except ET.ParseError as e:
-            logging.error(f"Erro ao parsear o XML: {e}")
+        except etree.ParseError as e:
+            logger.error("Erro ao parsear o XML: %s", e)
             return {'erro': 'Falha ao processar o XML'}
         except Exception as e:
-            logging.exception(f"Erro inesperado: {e}")
+            logger.exception("Erro inesperado: %s", e)
             return {'erro': f'Erro inesperado: {str(e)}'}
 
-    def _processar_nfe(self, root: ET.Element, tipo_documento: str) -> Dict[str, Any]:
-        """Process NF-e, CT-e, or MDF-e documents."""
-        logging.debug(f"Processando {tipo_documento}.")
-        try:
-            # Define namespace based on document type
-            if tipo_documento == 'NF-e':
-                ns = 'nfe'
-                uri = 'http://www.portalfiscal.inf.br/nfe'
-            elif tipo_documento == 'CT-e':
-                ns = 'cte'
-                uri = 'http://www.portalfiscal.inf.br/cte'
-            elif tipo_documento == 'MDF-e':
-                ns = 'mdfe'
-                uri = 'http://www.portalfiscal.inf.br/mdfe'
-            else:
-                raise ValueError("Tipo de documento inválido")
-
-            # Namespace mapping
-            namespaces = {ns: uri}
-
-            # Extract emitter CNPJ
-            cnpj_emitente = root.find(f'.//{ns}:emit/{ns}:CNPJ', namespaces)
-            if cnpj_emitente is None:
-                raise ValueError(f"CNPJ do emitente não encontrado no {tipo_documento}")
-
-            # Extract recipient identification
-            destinatario = self._extrair_destinatario(root, ns)
-            if destinatario is None:
-                raise ValueError(f"Destinatário não encontrado no {tipo_documento}")
-
-            # Extract access key and emission date
-            info_tag = f'inf{tipo_documento.replace("-", "")}'
-            info_element = root.find(f'.//{ns}:{info_tag}', namespaces)
-            if info_element is None or 'Id' not in info_element.attrib:
-                raise ValueError(f"Chave de acesso não encontrada no {tipo_documento}")
-            
-            chave_acesso = info_element.get('Id').replace(tipo_documento.replace("-", ""), '')
-
-            data_emissao = root.find(f'.//{ns}:ide/{ns}:dhEmi', namespaces)
-            if data_emissao is None:
-                raise ValueError(f"Data de emissão não encontrada no {tipo_documento}")
-
-            # Extract total value and ICMS values
-            valor_total_nota = root.find(f'.//{ns}:total/{ns}:ICMSTot/{ns}:vNF', namespaces)
-            if valor_total_nota is None:
-                raise ValueError(f"Valor total da nota não encontrado no {tipo_documento}")
-
-            valor_total_icms = root.find(f'.//{ns}:total/{ns}:ICMSTot/{ns}:vICMS', namespaces)
-            if valor_total_icms is None:
-                raise ValueError(f"Valor total de ICMS não encontrado no {tipo_documento}")
-
-
-            return self._formatar_saida(tipo_documento, cnpj_emitente.text, destinatario, chave_acesso, data_emissao.text)
-
-        except AttributeError as e:
-            logging.error(f"Erro ao processar {tipo_documento}: Estrutura inválida - {str(e)}")
-            return {'erro': f'Estrutura do {tipo_documento} inválida'}
-        except ValueError as e:
-            logging.error(f"Erro ao processar {tipo_documento}: {str(e)}")
-            return {'erro': str(e)}
-        except Exception as e:
-            logging.exception(f"Erro inesperado ao processar {tipo_documento}")
-            return {'erro': f'Erro inesperado ao processar {tipo_documento}: {str(e)}'}
-
-    def _processar_nfe1(self, root: ET.Element, tipo_documento: str) -> Dict[str, Any]:
-        """Process NF-e, CT-e, or MDF-e documents."""
-        logging.debug(f"Processando {tipo_documento}.")
-        try:
-            # Define namespace based on document type
-            ns = 'nfe' if tipo_documento == 'NF-e' else ('cte' if tipo_documento == 'CT-e' else 'mdfe')
-            
-            # Extract emitter CNPJ
-            cnpj_emitente = root.find(f'.//{ns}:emit/{ns}:CNPJ', self.namespaces)
-            if cnpj_emitente is None:
-                raise ValueError(f"CNPJ do emitente não encontrado no {tipo_documento}")
-
-            # Extract recipient identification
-            destinatario = self._extrair_destinatario(root, ns)
-            if destinatario is None:
-                raise ValueError(f"Destinatário não encontrado no {tipo_documento}")
-
-            # Extract access key and emission date
-            info_tag = f'inf{tipo_documento.replace("-", "")}'
-            chave_acesso = root.find(f'.//{ns}:{info_tag}', self.namespaces).get('Id').replace(tipo_documento.replace("-", ""), '')
-            data_emissao = root.find(f'.//{ns}:ide/{ns}:dhEmi', self.namespaces).text
-
-            return self._formatar_saida(tipo_documento, cnpj_emitente.text, destinatario, chave_acesso, data_emissao)
-
-        except AttributeError as e:
-            logging.error(f"Erro ao processar {tipo_documento}: Estrutura inválida - {str(e)}")
-            return {'erro': f'Estrutura do {tipo_documento} inválida'}
-        except ValueError as e:
-            logging.error(f"Erro ao processar {tipo_documento}: {str(e)}")
-            return {'erro': str(e)}
-        except Exception as e:
-            logging.exception(f"Erro inesperado ao processar {tipo_documento}")
-            return {'erro': f'Erro inesperado ao processar {tipo_documento}: {str(e)}'}
-
-    def _processar_nfse(self, root: ET.Element, tipo_documento: str) -> Dict[str, Any]:
-        """Process NFS-e documents."""
-        logging.debug("Processando NFS-e.")
-        try:
-            # Extract emitter CNPJ
-            cnpj_emitente = root.find('.//nfse:Prestador/nfse:Cnpj', self.namespaces)
-            if cnpj_emitente is None:
-                raise ValueError("CNPJ do prestador não encontrado na NFS-e")
-
-            # Extract recipient identification
-            tomador_cnpj = root.find('.//nfse:Tomador/nfse:IdentificacaoTomador/nfse:Cnpj', self.namespaces)
-            tomador_cpf = root.find('.//nfse:Tomador/nfse:IdentificacaoTomador/nfse:Cpf', self.namespaces)
-            
-            destinatario = tomador_cnpj.text if tomador_cnpj is not None else (
-                tomador_cpf.text if tomador_cpf is not None else None
-            )
-
-            if destinatario is None:
-                raise ValueError("Tomador não possui CNPJ ou CPF válido")
-
-            # Extract service number and emission date
-            numero_nfse = root.find('.//nfse:IdentificacaoNfse/nfse:Numero', self.namespaces)
-            if numero_nfse is None:
-                raise ValueError("Número da NFS-e não encontrado")
-
-            data_emissao = root.find('.//nfse:DataEmissao', self.namespaces)
-            if data_emissao is None:
-                raise ValueError("Data de emissão não encontrada na NFS-e")
-
-            return self._formatar_saida('NFS-e', cnpj_emitente.text, destinatario, 
-                                      numero_nfse.text, data_emissao.text)
+    @staticmethod
+    def _erro_evento(mensagem_log: str, erro: str) -> Dict[str, str]:
+        """
+        Registra e devolve o erro de um evento sem lançar exceção.
 
-        except AttributeError as e:
-            logging.error(f"Erro ao processar NFS-e: Estrutura inválida - {str(e)}")
-            return {'erro': 'Estrutura da NFS-e inválida'}
-        except ValueError as e:
-            logging.error(f"Erro ao processar NFS-e: {str(e)}")
-            return {'erro': str(e)}
-        except Exception as e:
-            logging.exception("Erro inesperado ao processar NFS-e")
-            return {'erro': f'Erro inesperado ao processar NFS-e: {str(e)}'}
+        Elementos ausentes são comuns nos eventos baixados da API; retornar o
+        erro diretamente evita montar e capturar uma exceção por documento.
+        """
+        logger.error(mensagem_log, erro)
+        return {'erro': erro}
 
-    def _processar_evento(self, root: ET.Element, tipo_documento: str) -> Dict[str, Any]:
+    def _processar_evento(self, root: etree._Element, tipo_documento: str) -> Dict[str, Any]:
         """Process event documents."""
-        logging.debug("Processando evento.")
+        logger.debug("Processando evento.")
         try:
-            ns = 'nfe'  # Default namespace
-            
-            # Extract required information
-            chave_acesso = root.find(f'.//{ns}:chNFe', self.namespaces)
-            tipo_evento = root.find(f'.//{ns}:tpEvento', self.namespaces)
-            descricao_evento = root.find(f'.//{ns}:xEvento', self.namespaces)
-            data_evento = root.find(f'.//{ns}:dhEvento', self.namespaces)
-
-            if None in [chave_acesso, tipo_evento, descricao_evento, data_evento]:
-                raise ValueError("Informações obrigatórias do evento não encontradas")
+            # Extract required information (uma única passada pela árvore)
+            campos = _coletar_campos(root, CAMPOS_EVENTO)
+            chave_acesso = campos.get('chave_acesso')
+            tipo_evento = campos.get('tipo_evento')
+            descricao_evento = campos.get('descricao_evento')
+            data_evento = campos.get('data_evento')
+
+            if (chave_acesso is None or tipo_evento is None
+                    or descricao_evento is None or data_evento is None):
+                return self._erro_evento("Erro ao processar evento: %s",
+                                         "Informações obrigatórias do evento não encontradas")
 
             return {
                 'tipo_documento': 'Evento',
@@ -706,22 +778,23 @@ class DocumentoFiscalParser:
                 'chave_acesso': chave_acesso.text,
                 'tipo_evento': tipo_evento.text,
                 'descricao_evento': descricao_evento.text,
-                'data_evento': datetime.fromisoformat(data_evento.text).strftime('%Y-%m-%d %H:%M:%S')
+                'data_evento': _formatar_data_hora(data_evento.text)
             }
 
         except AttributeError as e:
-            logging.error(f"Erro ao processar evento: Estrutura inválida - {str(e)}")
+            logger.error("Erro ao processar evento: Estrutura inválida - %s", e)
             return {'erro': 'Estrutura do evento inválida'}
         except ValueError as e:
-            logging.error(f"Erro ao processar evento: {str(e)}")
+            # Data/hora do evento fora do formato ISO 8601
+            logger.error("Erro ao processar evento: %s", e)
             return {'erro': str(e)}
         except Exception as e:
-            logging.exception("Erro inesperado ao processar evento")
+            logger.exception("Erro inesperado ao processar evento")
             return {'erro': f'Erro inesperado ao processar evento: {str(e)}'}
 
-    def _processar_proc_evento(self, root: ET.Element, tipo_documento: str) -> Dict[str, Any]:
+    def _processar_proc_evento(self, root: etree._Element, tipo_documento: str) -> Dict[str, Any]:
         """Process procEvento documents for any DFe type."""
-        logging.debug("Processando procEvento.")
+        logger.debug("Processando procEvento.")
         try:
             # Determine the namespace based on the root tag
             ns_map = {
@@ -735,65 +808,56 @@ class DocumentoFiscalParser:
 
             # If namespace not found, try to find the most specific namespace in the root element
             if ns is None:
-                for ns_prefix, ns_uri in root.nsmap.items():
-                    if ns_uri in self.namespaces.values():
-                        ns = ns_prefix
+                for ns_uri in root.nsmap.values():
+                    ns = self._prefixos_por_uri.get(ns_uri)
+                    if ns is not None:
                         break
 
+            # Caminhos já montados para o namespace identificado
+            caminhos = CAMINHOS_PROC_EVENTO.get(ns)
+            if caminhos is None:
+                return self._erro_evento("Erro ao processar procEvento: %s",
+                                         "Namespace do procEvento não identificado")
+
             # Extract event information
-            evento = root.find(f'.//{ns}:evento', self.namespaces)
+            # Primeiro evento/eventocte/eventomdf da árvore, parando no primeiro encontrado
+            evento = next(root.iterdescendants(*caminhos['tags_evento']), None)
             if evento is None:
-                evento = root.find(f'.//{ns}:eventocte', self.namespaces)
-                if evento is None:
-                    evento = root.find(f'.//{ns}:eventomdf', self.namespaces)
-                    if evento is None:
-                        raise ValueError("Evento não encontrado no procEvento")
+                return self._erro_evento("Erro ao processar procEvento: %s",
+                                         "Evento não encontrado no procEvento")
 
-            infEvento = evento.find(f'.//{ns}:infEvento', self.namespaces)
+            infEvento = evento.find(caminhos['infEvento'])
             if infEvento is None:
-                raise ValueError("infEvento não encontrado no procEvento")
-
-            # Extract required fields
-            campos = {
-                'chave_acesso': (f'.//{ns}:chNFe', 'text'),
-                'tipo_evento': (f'.//{ns}:tpEvento', 'text'),
-                'sequencia_evento': (f'.//{ns}:nSeqEvento', 'text'),
-                'cnpj_emitente': (f'.//{ns}:CNPJ', 'text'),
-                'data_evento': (f'.//{ns}:dhEvento', 'text'),
-                'descricao_evento': (f'.//{ns}:xEvento', 'text'),
-                'protocolo': (f'.//{ns}:nProt', 'text')
+                return self._erro_evento("Erro ao processar procEvento: %s",
+                                         "infEvento não encontrado no procEvento")
+
+            # Extract required fields em uma única passada pelo infEvento
+            # (os ausentes ficam fora do resultado, os demais na ordem de CAMPOS_PROC_EVENTO)
+            campos = _coletar_campos(infEvento, caminhos['campos'])
+            valores = {
+                campo: _formatar_data_hora(campos[campo].text) if campo == 'data_evento' else campos[campo].text
+                for campo in CAMPOS_PROC_EVENTO if campo in campos
             }
 
-            resultado = {'tipo_documento': tipo_documento}
-            resultado['isevent'] = '1'
-            
-            for campo, (xpath, attr_type) in campos.items():
-                elemento = infEvento.find(xpath, self.namespaces)
-                if elemento is not None:
-                    valor = getattr(elemento, attr_type)
-                    if campo == 'data_evento':
-                        valor = datetime.fromisoformat(valor).strftime('%Y-%m-%d %H:%M:%S')
-                    resultado[campo] = valor
-
             # Add processing status
-            retEvento = root.find(f'.//{ns}:retEvento', self.namespaces)
-            if retEvento is not None:
-                resultado['status_processamento'] = retEvento.find(f'.//{ns}:cStat', self.namespaces).text
-                resultado['motivo'] = retEvento.find(f'.//{ns}:xMotivo', self.namespaces).text
-
-            # Indica se o documento é um EVENTO (NFE/CTE/MDFE/)
-            resultado['isevent'] = '1'
+            retEvento = root.find(caminhos['retEvento'])
+            status = {} if retEvento is None else {
+                'status_processamento': retEvento.find(caminhos['cStat']).text,
+                'motivo': retEvento.find(caminhos['xMotivo']).text,
+            }
 
-            return resultado
+            # Resultado montado de uma vez; isevent indica se o documento é um EVENTO (NFE/CTE/MDFE/)
+            return {'tipo_documento': tipo_documento, 'isevent': '1', **valores, **status}
 
         except ValueError as e:
-            logging.error(f"Erro ao processar procEvento: {str(e)}")
+            # Data/hora do evento fora do formato ISO 8601
+            logger.error("Erro ao processar procEvento: %s", e)
             return {'erro': str(e)}
         except Exception as e:
-            logging.exception("Erro inesperado ao processar procEvento")
+            logger.exception("Erro inesperado ao processar procEvento")
             return {'erro': f'Erro inesperado ao processar procEvento: {str(e)}'}
 
-    def _processar_proc_eventoCTeMDFe(self, root: ET.Element, tipo_documento: str) -> Dict[str, Any]:
+    def _processar_proc_eventoCTeMDFe(self, root: etree._Element, tipo_documento: str) -> Dict[str, Any]:
         """
         Processa os eventos de CTe e MDFe
         Args:
@@ -811,76 +875,70 @@ class DocumentoFiscalParser:
             
             if 'procEventoCTe' in root_tag:
                 namespace = self.namespaces['cte']
+                tags = TAGS_EVENTO_CTE
             elif 'procEventoMDFe' in root_tag:
                 namespace = self.namespaces['mdfe']
+                tags = TAGS_EVENTO_MDFE
             else:
-                raise ValueError(f"Tipo de documento não suportado: {root_tag}")
-
-            # Criar namespace map para as buscas
-            nsmap = {'ns': namespace}
+                logger.error("Erro ao processar evento: Tipo de documento não suportado: %s", root_tag)
+                return None
 
             # Extrair informações do evento
-            info_evento = root.find('.//ns:infEvento', nsmap)
+            info_evento = root.find(tags['infEvento'])
             if info_evento is None:
-                raise ValueError("infEvento não encontrado no XML")
+                logger.error("Erro ao processar evento: infEvento não encontrado no XML")
+                return None
 
             # Extrair informações do evento detalhado
-            det_evento = info_evento.find('.//ns:detEvento', nsmap)
+            det_evento = info_evento.find(tags['detEvento'])
             if det_evento is None:
-                raise ValueError("detEvento não encontrado no XML")
+                logger.error("Erro ao processar evento: detEvento não encontrado no XML")
+                return None
 
             # Extrair informações do retorno
-            ret_evento = root.find('.//ns:retEventoCTe', nsmap) if 'cte' in namespace else root.find('.//ns:retEventoMDFe', nsmap)
+            ret_evento = root.find(tags['retEvento'])
             if ret_evento is None:
-                raise ValueError("retEvento não encontrado no XML")
+                logger.error("Erro ao processar evento: retEvento não encontrado no XML")
+                return None
 
             # Montar dicionário com as informações
             resultado = {
                 'tipo_documento': 'CTE' if 'cte' in namespace else 'MDFE',
-                'chave_acesso': info_evento.findtext('ns:chCTe', namespaces=nsmap) or info_evento.findtext('ns:chMDFe', namespaces=nsmap),
-                'tipo_evento': info_evento.findtext('ns:tpEvento', namespaces=nsmap),
-                'sequencia_evento': info_evento.findtext('ns:nSeqEvento', namespaces=nsmap),
-                'data_evento': info_evento.findtext('ns:dhEvento', namespaces=nsmap),
-                'status': ret_evento.findtext('.//ns:cStat', namespaces=nsmap),
-                'motivo': ret_evento.findtext('.//ns:xMotivo', namespaces=nsmap),
-                'protocolo': ret_evento.findtext('.//ns:nProt', namespaces=nsmap),
-                'data_registro': ret_evento.findtext('.//ns:dhRegEvento', namespaces=nsmap)
+                'chave_acesso': info_evento.findtext(tags['chCTe']) or info_evento.findtext(tags['chMDFe']),
+                'tipo_evento': info_evento.findtext(tags['tpEvento']),
+                'sequencia_evento': info_evento.findtext(tags['nSeqEvento']),
+                'data_evento': info_evento.findtext(tags['dhEvento']),
+                'status': ret_evento.findtext(tags['cStat']),
+                'motivo': ret_evento.findtext(tags['xMotivo']),
+                'protocolo': ret_evento.findtext(tags['nProt']),
+                'data_registro': ret_evento.findtext(tags['dhRegEvento'])
             }
 
             # Processar informações específicas do detEvento
             if det_evento is not None:
                 # Para eventos de MDFe autorizado em CTe
-                mdfe_info = det_evento.find('.//ns:MDFe', nsmap)
+                mdfe_info = det_evento.find(tags['MDFe'])
                 if mdfe_info is not None:
                     resultado['mdfe'] = {
-                        'chave_acesso': mdfe_info.findtext('ns:chMDFe', namespaces=nsmap),
-                        'protocolo': mdfe_info.findtext('ns:nProt', namespaces=nsmap),
-                        'data_recebimento': mdfe_info.findtext('ns:dhRecbto', namespaces=nsmap)
+                        'chave_acesso': mdfe_info.findtext(tags['chMDFe']),
+                        'protocolo': mdfe_info.findtext(tags['nProtMDFe']),
+                        'data_recebimento': mdfe_info.findtext(tags['dhRecbto'])
                     }
 
             resultado['isevent'] = '1'
 
             return resultado
 
-        except ET.ParseError as e:
-            logging.error(f"Erro ao fazer parse do XML: {e}")
+        except etree.ParseError as e:
+            logger.error("Erro ao fazer parse do XML: %s", e)
             return None
         except Exception as e:
-            logging.error(f"Erro ao processar evento: {e}")
+            logger.error("Erro ao processar evento: %s", e)
             return None
 
-    def _extrair_destinatario(self, root: ET.Element, ns: str) -> Optional[str]:
-        """Extract recipient identification (CNPJ or CPF) from document."""
-        dest_path = f'.//{ns}:dest'
-        destinatario = root.find(f'{dest_path}/{ns}:CNPJ', self.namespaces)
-        if destinatario is None:
-            destinatario = root.find(f'{dest_path}/{ns}:CPF', self.namespaces)
-        return destinatario.text if destinatario is not None else None
-
-    
     def _formatar_saida(self, tipo_documento, cnpj_emitente, destinatario, chave_acesso, data_emissao):
-        logging.debug("Formatando a saída do documento fiscal.")
-        data_emissao_formatada = datetime.fromisoformat(data_emissao).strftime('%Y-%m-%d %H:%M:%S')
+        logger.debug("Formatando a saída do documento fiscal.")
+        data_emissao_formatada = _formatar_data_hora(data_emissao)
         return {
             'tipo_documento': tipo_documento,
             'cnpj_emitente': cnpj_emitente,
@@ -889,4 +947,32 @@ class DocumentoFiscalParser:
             'data_emissao': data_emissao_formatada
         }
     # [Previous methods remain unchanged: parse_documento_fiscal_arquivo, _parse_xml, 
-    # _processar_nfse, _processar_evento, _formatar_saida]
\ No newline at end of file
+    # _processar_evento, _formatar_saida]
+
+
+# Parser de cada processo do pool de parse_documento_fiscal_batch
+_parser_worker: Optional[DocumentoFiscalParser] = None
+
+
+def _init_worker() -> None:
+    """Cria o parser reutilizado pelo processo do pool."""
+    global _parser_worker
+    _parser_worker = DocumentoFiscalParser()
+
+
+def _parse_arquivo_worker(caminho_arquivo: str) -> Dict[str, Any]:
+    """Parse de um arquivo XML. Executado nos processos do pool."""
+    return _parser_worker.parse_documento_fiscal_arquivo(caminho_arquivo)
+
+
+# Processador de cada tipo de documento, montado uma única vez em vez de a cada parse
+_PROCESSADORES = {
+    'NF-e': DocumentoFiscalParser.parse_nfe,
+    'CT-e': DocumentoFiscalParser.parse_cte,  # Similar structure to NF-e
+    'MDF-e': DocumentoFiscalParser.parse_mdfe, # Similar structure to NF-e
+    'NFS-e': DocumentoFiscalParser.parse_nfse,
+    'Evento': DocumentoFiscalParser._processar_evento,
+    'procEventoNFe': DocumentoFiscalParser._processar_proc_evento,
+    'procEventoCTe': DocumentoFiscalParser._processar_proc_eventoCTeMDFe,
+    'procEventoMDFe': DocumentoFiscalParser._processar_proc_eventoCTeMDFe
+}
@@ -1,11 +1,134 @@
-import xml.etree.ElementTree as ET
-import pandas as pd
 import pyarrow as pa
 import pyarrow.parquet as pq
 import os
-import glob
+import logging
 from lxml import etree
-import re
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# Namespaces dos DF-e ('ns' é o da NF-e)
+NAMESPACES = {
+    'ns': 'http://www.portalfiscal.inf.br/nfe',  # Namespace NF-e
+    'nfe': 'http://www.portalfiscal.inf.br/nfe',
+    'cte': 'http://www.portalfiscal.inf.br/cte',  # Namespace CT-e
+    'mdfe': 'http://www.portalfiscal.inf.br/mdfe'  # Namespace MDF-e
+}
+
+# Parser reutilizado na leitura dos XMLs validados; não expande entidades
+# nem carrega DTDs ou recursos da rede
+XML_PARSER = etree.XMLParser(resolve_entities=False, load_dtd=False, no_network=True)
+
+# Campos lidos por extrair_dados_dfe, no formato (tag do pai, tag). Os do emitente
+# e do destinatário valem para NF-e, CT-e e MDF-e; cidade e totais só para NF-e
+CAMPOS_DFE = {
+    'cnpj_emitente': ('emit', 'CNPJ'),
+    'cnpj_destinatario': ('dest', 'CNPJ'),
+    'cpf_destinatario': ('dest', 'CPF'),
+}
+CAMPOS_NFE = {
+    'cidade_destino': ('enderDest', 'xMun'),
+    'valor_total_dfe': ('ICMSTot', 'vNF'),
+    'valor_total_base_icms': ('ICMSTot', 'vBC'),
+    'valor_total_icms': ('ICMSTot', 'vICMS'),
+    'valor_total_pis': ('ICMSTot', 'vPIS'),
+    'valor_total_cofins': ('ICMSTot', 'vCOFINS'),
+    'valor_total_icms_st': ('ICMSTot', 'vST'),
+    'valor_total_base_icms_st': ('ICMSTot', 'vBCST'),
+}
+
+
+def _indexar_campos():
+    """
+    Indexa os campos por tag em notação Clark ({uri}tag) e, dentro dela, pela tag do pai.
+    """
+    indice = {}
+    for ns, campos in (('nfe', {**CAMPOS_DFE, **CAMPOS_NFE}), ('cte', CAMPOS_DFE), ('mdfe', CAMPOS_DFE)):
+        uri = NAMESPACES[ns]
+        for campo, (pai, tag) in campos.items():
+            indice.setdefault(f'{{{uri}}}{tag}', {})[f'{{{uri}}}{pai}'] = campo
+    return indice
+
+
+# Campos de valores monetários, convertidos para float na extração
+CAMPOS_VALORES = tuple(campo for campo in CAMPOS_NFE if campo.startswith('valor_total_'))
+
+# Colunas do arquivo Parquet gerado, na ordem do dicionário de extrair_dados_dfe.
+# Os valores monetários são gravados como float64; os demais campos, como texto
+SCHEMA_PARQUET = pa.schema(
+    [(coluna, pa.float64() if coluna in CAMPOS_VALORES else pa.string())
+     for coluna in ('chave_acesso', 'cnpj_emitente', 'cpf_cnpj_destinatario', *CAMPOS_NFE)]
+)
+
+# Quantidade de registros acumulados antes de cada conversão para uma tabela Arrow
+TAMANHO_LOTE_PARQUET = 8192
+
+# Linhas por row group do Parquet: as tabelas Arrow (compactas em memória) são
+# acumuladas até esse total e gravadas juntas
+LINHAS_POR_ROW_GROUP = 131072
+
+# Opções de gravação: ZSTD e dicionário aproveitam a repetição de CNPJs e cidades
+OPCOES_PARQUET = {
+    'compression': 'zstd',
+    'compression_level': 3,
+    'use_dictionary': True,
+    'data_page_size': 1 << 20,
+}
+
+# Elementos cujo atributo Id traz a chave de acesso
+TAGS_CHAVE_ACESSO = frozenset((
+    f"{{{NAMESPACES['nfe']}}}infNFe",
+    f"{{{NAMESPACES['cte']}}}infCte",
+    f"{{{NAMESPACES['mdfe']}}}infMDFe",
+))
+CAMPOS_POR_TAG = _indexar_campos()
+# Únicas tags entregues pelo iterparse, filtradas já no lxml
+TAGS_ITERPARSE = tuple(TAGS_CHAVE_ACESSO) + tuple(CAMPOS_POR_TAG)
+
+
+def _valor(texto):
+    """Converte o texto de um valor do XML (ex.: '117.00') para float, ou None se ausente."""
+    return float(texto) if texto else None
+
+
+def _coletar_campos(arquivo_xml):
+    """
+    Lê o arquivo em uma única passada com iterparse, guardando o texto da
+    primeira ocorrência de cada campo e o Id do primeiro infNFe/infCte/infMDFe.
+
+    Só as tags de TAGS_ITERPARSE são entregues pelo lxml. Cada uma é limpa
+    depois de lida, junto com os irmãos anteriores. Os demais elementos do
+    documento continuam na árvore até o fim da leitura.
+    """
+    dados = {}
+    contexto = etree.iterparse(
+        arquivo_xml, events=('end',), tag=TAGS_ITERPARSE,
+        resolve_entities=False, load_dtd=False, no_network=True
+    )
+    for _, elemento in contexto:
+        tag = elemento.tag
+        if tag in TAGS_CHAVE_ACESSO:
+            dados.setdefault('chave_acesso', elemento.get('Id'))
+        else:
+            campo = CAMPOS_POR_TAG[tag].get(elemento.getparent().tag)
+            if campo is not None:
+                dados.setdefault(campo, elemento.text)
+
+        elemento.clear()
+        while elemento.getprevious() is not None:
+            del elemento.getparent()[0]
+    return dados
+
+
+@lru_cache(maxsize=8)
+def _carregar_schema(schema_xsd, mtime):
+    """
+    Compila o schema XSD. O mtime faz parte da chave do cache, invalidando-o
+    quando o arquivo do schema é modificado.
+    """
+    return etree.XMLSchema(etree.parse(schema_xsd))
+
 
 def validar_schema_xml(arquivo_xml, schema_xsd):
     """
@@ -19,20 +142,20 @@ def validar_schema_xml(arquivo_xml, schema_xsd):
         bool: True se o arquivo XML for válido, False caso contrário.
     """
     try:
-        xml_parser = etree.XMLParser()
-        xml_tree = etree.parse(arquivo_xml, xml_parser)
+        xml_tree = etree.parse(arquivo_xml, XML_PARSER)
 
-        xsd_tree = etree.parse(schema_xsd)
-        xml_schema = etree.XMLSchema(xsd_tree)
+        # Schema compilado uma única vez; recompilado apenas se o XSD for alterado
+        xml_schema = _carregar_schema(schema_xsd, os.path.getmtime(schema_xsd))
 
         if xml_schema.validate(xml_tree):
             return True
         else:
-            print(f"Arquivo XML '{arquivo_xml}' não está em conformidade com o schema XSD '{schema_xsd}'. Erros: {xml_schema.error_log}")
+            logger.warning("Arquivo XML '%s' não está em conformidade com o schema XSD '%s'. Erros: %s",
+                           arquivo_xml, schema_xsd, xml_schema.error_log)
             return False
 
     except Exception as e:
-        print(f"Erro ao validar schema para o arquivo '{arquivo_xml}': {e}")
+        logger.error("Erro ao validar schema para o arquivo '%s': %s", arquivo_xml, e)
         return False
 
 
@@ -50,89 +173,38 @@ def extrair_dados_dfe(arquivo_xml):
     """
 
     try:
-        tree = ET.parse(arquivo_xml)
-        root = tree.getroot()
-
-        # Define namespaces
-        namespaces = {
-            'ns': 'http://www.portalfiscal.inf.br/nfe',  # Namespace NF-e
-            'nfe': 'http://www.portalfiscal.inf.br/nfe',
-            'cte': 'http://www.portalfiscal.inf.br/cte',  # Namespace CT-e
-            'mdfe': 'http://www.portalfiscal.inf.br/mdfe'  # Namespace MDF-e
-        }
-
-        # Extrai a chave de acesso usando XPath (considerando diferentes namespaces)
-        chave_acesso_elemento = root.find('.//ns:infNFe/ns:Id', namespaces) or \
-                                 root.find('.//cte:infCte/cte:Id', namespaces) or \
-                                 root.find('.//mdfe:infMDFe/mdfe:Id', namespaces)
+        dados = _coletar_campos(arquivo_xml)
 
-        if chave_acesso_elemento is None:
-            print(f"Chave de acesso não encontrada no arquivo '{arquivo_xml}'.")
+        # Extrai a chave de acesso (atributo Id do infNFe/infCte/infMDFe)
+        chave_acesso = dados.get('chave_acesso')
+        if chave_acesso is None:
+            logger.warning("Chave de acesso não encontrada no arquivo '%s'.", arquivo_xml)
             return None
 
-        chave_acesso = chave_acesso_elemento.text.replace('NFe', '').replace('CTe', '').replace('MDFe', '')
+        chave_acesso = chave_acesso.replace('NFe', '').replace('CTe', '').replace('MDFe', '')
 
         # Valida a chave de acesso
         if not validar_chave_acesso(chave_acesso):
-            print(f"Chave de acesso inválida no arquivo '{arquivo_xml}'.")
+            logger.warning("Chave de acesso inválida no arquivo '%s'.", arquivo_xml)
             return None
 
-        # Extrai dados do emitente (considerando diferentes namespaces)
-        emitente = root.find('.//ns:emit', namespaces) or root.find('.//cte:emit', namespaces) or root.find('.//mdfe:emit', namespaces)
-        cnpj_emitente = emitente.find('.//ns:CNPJ', namespaces).text if emitente.find('.//ns:CNPJ', namespaces) is not None else None
-
-        # Extrai dados do destinatário (considerando diferentes namespaces e CPF/CNPJ)
-        destinatario = root.find('.//ns:dest', namespaces) or root.find('.//cte:dest', namespaces) or root.find('.//mdfe:dest', namespaces)
-        if destinatario is not None:
-            if destinatario.find('.//ns:CNPJ', namespaces) is not None:
-                cpf_cnpj_destinatario = destinatario.find('.//ns:CNPJ', namespaces).text
-            elif destinatario.find('.//ns:CPF', namespaces) is not None:
-                cpf_cnpj_destinatario = destinatario.find('.//ns:CPF', namespaces).text
-            else:
-                cpf_cnpj_destinatario = None
-        else:
-            cpf_cnpj_destinatario = None
-
-        # Extrai dados do total (considerando diferentes namespaces)
-        total = root.find('.//ns:total/ns:ICMSTot', namespaces) or root.find('.//cte:total/cte:ICMSTot', namespaces)
-        if total is not None:
-            valor_total_dfe = total.find('.//ns:vNF', namespaces).text if total.find('.//ns:vNF', namespaces) is not None else None
-            valor_total_base_icms = total.find('.//ns:vBC', namespaces).text if total.find('.//ns:vBC', namespaces) is not None else None
-            valor_total_icms = total.find('.//ns:vICMS', namespaces).text if total.find('.//ns:vICMS', namespaces) is not None else None
-            valor_total_pis = total.find('.//ns:vPIS', namespaces).text if total.find('.//ns:vPIS', namespaces) is not None else None
-            valor_total_cofins = total.find('.//ns:vCOFINS', namespaces).text if total.find('.//ns:vCOFINS', namespaces) is not None else None
-            valor_total_icms_st = total.find('.//ns:vST', namespaces).text if total.find('.//ns:vST', namespaces) is not None else None
-            valor_total_base_icms_st = total.find('.//ns:vBCST', namespaces).text if total.find('.//ns:vBCST', namespaces) is not None else None
-        else:
-            valor_total_dfe = None
-            valor_total_base_icms = None
-            valor_total_icms = None
-            valor_total_pis = None
-            valor_total_cofins = None
-            valor_total_icms_st = None
-            valor_total_base_icms_st = None
-
-        # Extrai a cidade de destino (considerando diferentes namespaces)
-        cidade_destino = root.find('.//ns:dest/ns:enderDest/ns:xMun', namespaces).text if root.find('.//ns:dest/ns:enderDest/ns:xMun', namespaces) is not None else None
+        # Destinatário identificado por CNPJ ou, na falta dele, por CPF
+        cpf_cnpj_destinatario = dados.get('cnpj_destinatario')
+        if cpf_cnpj_destinatario is None:
+            cpf_cnpj_destinatario = dados.get('cpf_destinatario')
 
         dados_extraidos = {
             'chave_acesso': chave_acesso,
-            'cnpj_emitente': cnpj_emitente,
+            'cnpj_emitente': dados.get('cnpj_emitente'),
             'cpf_cnpj_destinatario': cpf_cnpj_destinatario,
-            'cidade_destino': cidade_destino,
-            'valor_total_dfe': valor_total_dfe,
-            'valor_total_base_icms': valor_total_base_icms,
-            'valor_total_icms': valor_total_icms,
-            'valor_total_pis': valor_total_pis,
-            'valor_total_cofins': valor_total_cofins,
-            'valor_total_icms_st': valor_total_icms_st,
-            'valor_total_base_icms_st': valor_total_base_icms_st
+            'cidade_destino': dados.get('cidade_destino'),
+            **{campo: _valor(dados.get(campo)) for campo in CAMPOS_VALORES}
         }
 
         return dados_extraidos
 
     except Exception as e:
-        print(f"Erro ao processar o arquivo '{arquivo_xml}': {e}")
+        logger.error("Erro ao processar o arquivo '%s': %s", arquivo_xml, e)
         return None
 
 def validar_chave_acesso(chave_acesso):
@@ -146,121 +218,80 @@ def validar_chave_acesso(chave_acesso):
         bool: True se a chave de acesso for válida, False caso contrário.
     """
 
-    # Expressões regulares para validar cada tipo de chave de acesso
-    padrao_nfe = r"^[0-9]{44}$"
-    padrao_cte = r"^[0-9]{44}$"
-    padrao_mdfe = r"^[0-9]{44}$"
-
-    # Verifica o tipo de chave de acesso e aplica a validação correspondente
-    if len(chave_acesso) == 44:
-        if re.match(padrao_nfe, chave_acesso):
-            return True  # NF-e válida
-        elif re.match(padrao_cte, chave_acesso):
-            return True  # CT-e válida
-        elif re.match(padrao_mdfe, chave_acesso):
-            return True  # MDF-e válida
-
-    return False  # Chave de acesso inválida
-    """
-    Extrai dados relevantes de um arquivo XML de DF-e.
+    # NF-e, CT-e e MDF-e usam o mesmo formato: 44 dígitos de 0 a 9
+    # (isascii descarta os dígitos Unicode que isdigit também aceitaria)
+    return len(chave_acesso) == 44 and chave_acesso.isascii() and chave_acesso.isdigit()
 
-    Args:
-        arquivo_xml (str): Caminho para o arquivo XML.
-        namespaces (dict): Namespaces utilizados nos arquivos XML.
 
-    Returns:
-        dict: Um dicionário com os dados extraídos, ou None em caso de erro.
-    """
-
-    try:
-        tree = ET.parse(arquivo_xml)
-        root = tree.getroot()
-
-        # Extrai a chave de acesso (funciona para NF-e, CT-e e MDF-e)
-        chave_acesso = root.find('.//ns:infNFe/ns:Id', namespaces).text.replace('NFe', '')
-
-        # Extrai dados do emitente
-        cnpj_emitente = root.find('.//ns:emit/ns:CNPJ', namespaces).text
-
-        # Extrai dados do destinatário (pode ser CPF ou CNPJ)
-        destinatario = root.find('.//ns:dest', namespaces)
-        if destinatario.find('.//ns:CNPJ', namespaces) is not None:
-            cpf_cnpj_destinatario = destinatario.find('.//ns:CNPJ', namespaces).text
-        else:
-            cpf_cnpj_destinatario = destinatario.find('.//ns:CPF', namespaces).text
-
-        # Extrai dados do ICMS (pode variar entre NF-e, CT-e e MDF-e)
-        valor_total_dfe = root.find('.//ns:total/ns:ICMSTot/ns:vNF', namespaces).text
-        valor_total_base_icms = root.find('.//ns:total/ns:ICMSTot/ns:vBC', namespaces).text
-        valor_total_icms = root.find('.//ns:total/ns:ICMSTot/ns:vICMS', namespaces).text
-        valor_total_pis = root.find('.//ns:total/ns:ICMSTot/ns:vPIS', namespaces).text
-        valor_total_cofins = root.find('.//ns:total/ns:ICMSTot/ns:vCOFINS', namespaces).text
-        valor_total_icms_st = root.find('.//ns:total/ns:ICMSTot/ns:vST', namespaces).text
-        valor_total_base_icms_st = root.find('.//ns:total/ns:ICMSTot/ns:vBCST', namespaces).text
-
-        # Extrai a cidade de destino (pode variar entre NF-e, CT-e e MDF-e)
-        cidade_destino = root.find('.//ns:dest/ns:enderDest/ns:xMun', namespaces).text
-
-        dados_extraidos = {
-            'chave_acesso': chave_acesso,
-            'cnpj_emitente': cnpj_emitente,
-            'cpf_cnpj_destinatario': cpf_cnpj_destinatario,
-            'cidade_destino': cidade_destino,
-            'valor_total_dfe': valor_total_dfe,
-            'valor_total_base_icms': valor_total_base_icms,
-            'valor_total_icms': valor_total_icms,
-            'valor_total_pis': valor_total_pis,
-            'valor_total_cofins': valor_total_cofins,
-            'valor_total_icms_st': valor_total_icms_st,
-            'valor_total_base_icms_st': valor_total_base_icms_st
-        }
-
-        return dados_extraidos
-
-    except ET.ParseError as e:
-        print(f"Erro de parsing XML no arquivo '{arquivo_xml}': {e}")
-        return None
-    except AttributeError as e:
-        print(f"Atributo não encontrado no arquivo '{arquivo_xml}': {e}")
-        return None
-    except Exception as e:
-        print(f"Erro ao processar o arquivo '{arquivo_xml}': {e}")
-        return None
-
-
-def converter_xml_para_parquet(pasta_xml, arquivo_parquet) : #, schema_xsd):
+def converter_xml_para_parquet(pasta_xml, arquivo_parquet, max_workers=None) : #, schema_xsd):
     """
     Converte múltiplos arquivos XML de DF-e em um único arquivo Parquet.
 
+    Os arquivos são independentes entre si e são lidos em paralelo, em processos separados.
+    Os registros são acumulados por coluna e convertidos para Arrow em lotes de TAMANHO_LOTE_PARQUET linhas e
+    gravados a cada LINHAS_POR_ROW_GROUP, à medida que são extraídos, sem guardar
+    todos os registros até o fim.
+
     Args:
         pasta_xml (str): Caminho para a pasta contendo os arquivos XML.
         arquivo_parquet (str): Caminho para o arquivo Parquet de saída.
+        max_workers (int, optional): Quantidade de processos. Padrão: os.cpu_count().
         schema_xsd (str): Caminho para o arquivo XSD de validação.
     """
 
-    lista_arquivos = listar_arquivos_xml(output_dir)
-    todos_dados = []
-    for arquivo_xml in lista_arquivos: # glob.glob(os.path.join(pasta_xml, '*.xml')):
+    lista_arquivos = listar_arquivos_xml(pasta_xml)
+
+    #if not validar_schema_xml(arquivo_xml, schema_xsd):
+    #    continue  # Ignora arquivos inválidos
+
+    writer = None
+    # Uma lista por coluna do schema, em vez de uma lista de dicionários
+    lote = {coluna: [] for coluna in SCHEMA_PARQUET.names}
+    linhas_lote = 0
+    tabelas = []
+    linhas_pendentes = 0
+
+    def adicionar_registro(dados):
+        nonlocal linhas_lote
+        for coluna, valores in lote.items():
+            valores.append(dados[coluna])
+        linhas_lote += 1
+
+    def converter_lote():
+        nonlocal linhas_lote, linhas_pendentes
+        tabelas.append(pa.Table.from_pydict(lote, schema=SCHEMA_PARQUET))
+        linhas_pendentes += linhas_lote
+        linhas_lote = 0
+        for valores in lote.values():
+            valores.clear()
+
+    def gravar_row_group():
+        nonlocal writer, linhas_pendentes
+        # O arquivo só é criado quando há o primeiro row group a gravar
+        if writer is None:
+            writer = pq.ParquetWriter(arquivo_parquet, SCHEMA_PARQUET, **OPCOES_PARQUET)
+        writer.write_table(pa.concat_tables(tabelas), row_group_size=LINHAS_POR_ROW_GROUP)
+        tabelas.clear()
+        linhas_pendentes = 0
 
-        #if not validar_schema_xml(arquivo_xml, schema_xsd):
-        #    continue  # Ignora arquivos inválidos
-
-        namespaces = {
-            'ns': 'http://www.portalfiscal.inf.br/nfe',  # Namespace NF-e
-            'nfe': 'http://www.portalfiscal.inf.br/nfe',
-            'cte': 'http://www.portalfiscal.inf.br/cte',  # Namespace CT-e
-            'mdfe': 'http://www.portalfiscal.inf.br/mdfe'  # Namespace MDF-e
-        }
-
-        dados_extraidos = extrair_dados_dfe(arquivo_xml) #, namespaces)
-
-        if dados_extraidos:
-            todos_dados.append(dados_extraidos)
-
-    if todos_dados:
-        df = pd.DataFrame(todos_dados)
-        tabela = pa.Table.from_pandas(df)
-        pq.write_table(tabela, arquivo_parquet)
+    try:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            for dados in executor.map(extrair_dados_dfe, lista_arquivos, chunksize=32):
+                if dados:
+                    adicionar_registro(dados)
+                    if linhas_lote >= TAMANHO_LOTE_PARQUET:
+                        converter_lote()
+                        if linhas_pendentes >= LINHAS_POR_ROW_GROUP:
+                            gravar_row_group()
+        if linhas_lote:
+            converter_lote()
+        if tabelas:
+            gravar_row_group()
+    finally:
+        if writer is not None:
+            writer.close()
+
+    if writer is not None:
         print(f"Arquivo Parquet '{arquivo_parquet}' criado com sucesso!")
     else:
         print("Nenhum dado extraído dos arquivos XML.")
@@ -270,32 +301,48 @@ def converter_xml_para_parquet(pasta_xml, arquivo_parquet) : #, schema_xsd):
 
 def listar_arquivos_xml(pasta):
     """
-    Lista os arquivos XML em uma pasta e suas subpastas.
+    Percorre os arquivos XML em uma pasta e suas subpastas.
+
+    A pasta é percorrida com os.scandir, que já traz o tipo de cada entrada na
+    própria listagem, sem um stat por arquivo. Mesma ordem do os.walk: os
+    arquivos da pasta e depois as subpastas, sem seguir links simbólicos.
 
     Args:
         pasta (str): Caminho para a pasta.
 
-    Returns:
-        list: Lista de caminhos completos para os arquivos XML na pasta e subpastas.
+    Yields:
+        str: Caminho completo de cada arquivo XML na pasta e subpastas.
     """
-    arquivos_xml = []
-    for root, dirs, files in os.walk(pasta):
-        for file in files:
-            if file.endswith(".xml"):
-                arquivos_xml.append(os.path.join(root, file))
-    return arquivos_xml
-
-
-
-
-output_dir = os.path.join(os.path.join(os.getcwd(), "temp"))
-# Exemplo de uso
-pasta_xml = output_dir #'caminho/para/pasta/xml'  # Substitua pelo caminho da sua pasta
-arquivo_parquet = 'dados_dfe.parquet'
-schema_xsd = 'caminho/para/schema/nfe_v4.00.xsd'  # Substitua pelo caminho do seu schema XSD
-
-output_dir = os.path.join(os.path.join(os.getcwd(), "temp"))
-lista_arquivos = listar_arquivos_xml(output_dir)
-
-
-converter_xml_para_parquet(output_dir, arquivo_parquet) #, schema_xsd)
\ No newline at end of file
+    pendentes = [pasta]
+    while pendentes:
+        subpastas = []
+        try:
+            with os.scandir(pendentes.pop()) as entradas:
+                for entrada in entradas:
+                    if entrada.is_dir():
+                        if not entrada.is_symlink():
+                            subpastas.append(entrada.path)
+                    elif entrada.name.endswith(".xml"):
+                        yield entrada.path
+        except OSError:
+            # Como no os.walk, pastas que não podem ser listadas são ignoradas
+            continue
+
+        # Invertidas para que a pilha as visite na ordem da listagem
+        pendentes.extend(reversed(subpastas))
+
+
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.getLevelNamesMapping().get(os.getenv("LOGLEVEL", "INFO").upper(), logging.INFO),
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    output_dir = os.path.join(os.path.join(os.getcwd(), "temp"))
+    # Exemplo de uso
+    pasta_xml = output_dir #'caminho/para/pasta/xml'  # Substitua pelo caminho da sua pasta
+    arquivo_parquet = 'dados_dfe.parquet'
+    schema_xsd = 'caminho/para/schema/nfe_v4.00.xsd'  # Substitua pelo caminho do seu schema XSD
+
+    converter_xml_para_parquet(output_dir, arquivo_parquet) #, schema_xsd)
\ No newline at end of file
@@ -1,43 +1,142 @@
 import os
+from functools import lru_cache
+from itertools import repeat
+from concurrent.futures import ProcessPoolExecutor
+from lxml import etree
+import nfelib
+from xsdata.formats.dataclass.parsers import XmlParser
+from xsdata.formats.dataclass.parsers.handlers import LxmlEventHandler
 from nfelib.nfe.bindings.v4_0.proc_nfe_v4_00 import NfeProc
 
+# Listagem dos XMLs compartilhada com o appDFe
+from appDFe import listar_arquivos_xml
 
-def listar_arquivos_xml(pasta):
+# Opções comuns aos parsers do lxml: sem expansão de entidades, DTDs ou acesso à rede
+OPCOES_PARSER = dict(
+    huge_tree=True, remove_blank_text=True, collect_ids=False,
+    resolve_entities=False, load_dtd=False, no_network=True
+)
+
+# Parser do lxml (libxml2) utilizado na leitura dos XMLs de NF-e
+XML_PARSER = etree.XMLParser(**OPCOES_PARSER)
+
+# Schema XSD da NF-e processada distribuído junto com a nfelib
+SCHEMA_NFE_PROC = os.path.join(
+    os.path.dirname(nfelib.__file__), 'nfe', 'schemas', 'v4_0', 'procNFe_v4.00.xsd'
+)
+
+TAG_NFE_PROC = '{http://www.portalfiscal.inf.br/nfe}nfeProc'
+
+# Parser do xsdata compartilhado: o contexto com os metadados das classes da
+# nfelib é montado uma vez, e não a cada NF-e lida
+NFE_PARSER = XmlParser(handler=LxmlEventHandler)
+
+
+@lru_cache(maxsize=None)
+def obter_schema_nfe_proc():
+    """
+    Retorna o schema usado na validação dos XMLs de NF-e processada.
+
+    O schema é compilado uma única vez por processo, na primeira chamada, e
+    reutilizado em todas as leituras seguintes.
+
+    Returns:
+        etree.XMLSchema: Schema compilado da NF-e processada.
+    """
+    return etree.XMLSchema(etree.parse(SCHEMA_NFE_PROC))
+
+
+def carregar_nfe_proc(caminho_arquivo):
     """
-    Lista os arquivos XML em uma pasta e suas subpastas.
+    Carrega um arquivo XML de NF-e processada utilizando o parser do lxml.
+
+    A árvore gerada pelo lxml é entregue diretamente ao xsdata, sem
+    serialização intermediária para string.
 
     Args:
-        pasta (str): Caminho para a pasta.
+        caminho_arquivo (str): Caminho para o arquivo XML.
 
     Returns:
-        list: Lista de caminhos completos para os arquivos XML na pasta e subpastas.
+        NfeProc: Objeto da NF-e preenchido a partir do XML.
+    """
+    arvore = etree.parse(caminho_arquivo, XML_PARSER)
+    return NFE_PARSER.parse(arvore, NfeProc)
+
+
+def iter_nfe_procs(caminho_arquivo, validar=False):
+    """
+    Percorre um arquivo XML de forma incremental, gerando cada nfeProc encontrado.
+
+    Cada elemento é liberado assim que convertido, mantendo em memória apenas
+    o documento corrente, o que permite processar lotes com muitas NF-e.
+
+    Args:
+        caminho_arquivo (str): Caminho para o arquivo XML.
+        validar (bool, optional): Valida o XML contra o schema da NF-e. Padrão: False.
+
+    Yields:
+        NfeProc: Objeto de cada NF-e presente no arquivo.
+
+    Raises:
+        etree.XMLSyntaxError: Se o XML for inválido perante o schema (com validar=True).
+    """
+    contexto = etree.iterparse(
+        caminho_arquivo, events=('end',), tag=TAG_NFE_PROC,
+        schema=obter_schema_nfe_proc() if validar else None, **OPCOES_PARSER
+    )
+    for _, elemento in contexto:
+        yield NFE_PARSER.parse(elemento, NfeProc)
+        elemento.clear()
+        while elemento.getprevious() is not None:
+            del elemento.getparent()[0]
+
+
+def _carregar_nfe_procs_arquivo(caminho_arquivo, validar=False):
+    """
+    Carrega todas as NF-e de um arquivo. Executado nos processos do pool.
+
+    O XMLSyntaxError do lxml não pode ser devolvido ao processo principal (seu
+    log de erros não é serializável), por isso é relançado como ValueError.
     """
-    arquivos_xml = []
-    for root, dirs, files in os.walk(pasta):
-        for file in files:
-            if file.endswith(".xml"):
-                arquivos_xml.append(os.path.join(root, file))
-    return arquivos_xml
+    try:
+        return list(iter_nfe_procs(caminho_arquivo, validar))
+    except etree.XMLSyntaxError as e:
+        raise ValueError(f"{caminho_arquivo}: {e}") from None
 
 
+def carregar_nfe_procs_em_lote(arquivos, max_workers=None, validar=False):
+    """
+    Carrega as NF-e de vários arquivos XML em paralelo, em processos separados.
+
+    Args:
+        arquivos (iterable): Caminhos dos arquivos XML.
+        max_workers (int, optional): Quantidade de processos. Padrão: os.cpu_count().
+        validar (bool, optional): Valida cada XML contra o schema da NF-e, compilado
+            uma vez em cada processo. Padrão: False.
 
+    Yields:
+        tuple: Caminho do arquivo e a lista de NfeProc nele encontrados, na ordem de entrada.
 
-output_dir = os.path.join(os.path.join(os.getcwd(), "temp"))
-# Exemplo de uso
-pasta_xml = output_dir #'caminho/para/pasta/xml'  # Substitua pelo caminho da sua pasta
-arquivo_parquet = 'dados_dfe.parquet'
-schema_xsd = 'caminho/para/schema/nfe_v4.00.xsd'  # Substitua pelo caminho do seu schema XSD
+    Raises:
+        ValueError: Se um arquivo for malformado ou, com validar=True, inválido perante o schema.
+    """
+    arquivos = list(arquivos)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        yield from zip(arquivos, executor.map(_carregar_nfe_procs_arquivo, arquivos, repeat(validar), chunksize=8))
 
-output_dir = os.path.join(os.path.join(os.getcwd(), "temp"))
-lista_arquivos = listar_arquivos_xml(output_dir)
 
-##nfe_proc = NfeProc.from_path("nfelib/nfe/samples/v4_0/leiauteNFe/NFe35200159594315000157550010000000012062777161.xml")
+if __name__ == "__main__":
+    output_dir = os.path.join(os.path.join(os.getcwd(), "temp"))
+    # Exemplo de uso
+    pasta_xml = output_dir #'caminho/para/pasta/xml'  # Substitua pelo caminho da sua pasta
+    arquivo_parquet = 'dados_dfe.parquet'
+    schema_xsd = 'caminho/para/schema/nfe_v4.00.xsd'  # Substitua pelo caminho do seu schema XSD
 
-# Ler o XML de uma NF-e:
-for arquivo in lista_arquivos:
-    
-    nfe_proc = NfeProc.from_path(arquivo)
-    nfe_proc.to_xml()
-    print(nfe_proc.NFe.infNFe.Id) #, nfe_proc.infNFe.emit.xNome, nfe_proc.infNFe.dest.xNome, nfe_proc.infNFe.dest.enderDest.vTotal)
+    lista_arquivos = listar_arquivos_xml(output_dir)
 
+    ##nfe_proc = NfeProc.from_path("nfelib/nfe/samples/v4_0/leiauteNFe/NFe35200159594315000157550010000000012062777161.xml")
 
+    # Ler os XMLs de NF-e em paralelo:
+    for arquivo, nfe_procs in carregar_nfe_procs_em_lote(lista_arquivos):
+        for nfe_proc in nfe_procs:
+            print(nfe_proc.NFe.infNFe.Id) #, nfe_proc.infNFe.emit.xNome, nfe_proc.infNFe.dest.xNome, nfe_proc.infNFe.dest.enderDest.vTotal)
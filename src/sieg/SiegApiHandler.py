@@ -1,9 +1,14 @@
 import os
+import stat
 import time
+import hashlib
 import json
 import base64
 import requests
+from requests.adapters import HTTPAdapter
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from enum import Enum
 from typing import Union, Optional
@@ -11,15 +16,61 @@ from dotenv import load_dotenv
 from utils.functions import GerenciadorArquivos
 from dfe.DocumentoFiscalParser import DocumentoFiscalParser
 
-# Configuração do logging
+# orjson é opcional; quando instalado, acelera a leitura das respostas JSON
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+# pybase64 é opcional; quando instalado, decodifica o Base64 com instruções SIMD
+# (levanta o mesmo binascii.Error do módulo base64 em caso de erro)
+try:
+    import pybase64
+    _b64decode = pybase64.b64decode
+except ImportError:
+    _b64decode = base64.b64decode
+
+# Configuração do logging; valores de LOGLEVEL desconhecidos usam INFO
 logging.basicConfig(
-    level=logging.INFO,
+    level=logging.getLevelNamesMapping().get(os.getenv("LOGLEVEL", "INFO").upper(), logging.INFO),
     format='%(asctime)s - %(levelname)s - %(message)s',
     handlers=[
         logging.FileHandler("sieg_api.log"),
         logging.StreamHandler()
     ]
 )
+logger = logging.getLogger(__name__)
+
+# Variáveis de ambiente carregadas do .env uma única vez, na importação do módulo
+ENV_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), '.env')
+load_dotenv(dotenv_path=ENV_PATH)
+API_KEY = os.getenv("API_KEY")
+URL_BAIXAR_XMLS = os.getenv("URL_BAIXAR_XMLS")
+
+# Marcador gravado na pasta de um tipo de XML quando todos os intervalos de um
+# dia já encerrado foram baixados sem erro; execuções seguintes pulam essa pasta
+ARQUIVO_CONCLUIDO = ".done"
+
+# Quantidade máxima de documentos devolvidos por consulta; intervalos com mais
+# documentos são percorridos em páginas (Skip)
+ITENS_POR_PAGINA = 50
+
+# Tentativas de cada consulta em falhas de conexão e nas respostas de STATUS_REPETIR;
+# cada tentativa passa pelo intervalo mínimo entre requisições
+TENTATIVAS_REQUISICAO = 5
+STATUS_REPETIR = frozenset((429, 500, 502, 503, 504))
+
+# Intervalos de consulta de cada dia, em horas (início, fim): 12 blocos de duas horas,
+# das hh:00:00 até as (hh+1):59:59
+INTERVALOS_HORARIOS = tuple((hora, hora + 1) for hora in range(0, 24, 2))
+
+def _formatar_data_api(data: datetime) -> str:
+    """
+    Formata a data no padrão da API (AAAA-MM-DDTHH:MM:SS.mmmZ), sem passar pelo strftime.
+    """
+    return (f"{data.year:04}-{data.month:02}-{data.day:02}T"
+            f"{data.hour:02}:{data.minute:02}:{data.second:02}.{data.microsecond // 1000:03}Z")
 
 class XmlType(Enum):
     NFE = 1
@@ -33,21 +84,60 @@ class SiegApiHandler:
     Classe para gerenciar interações com a API da Sieg e processar os arquivos retornados.
     """
 
-    def __init__(self):
-        # Carregar variáveis de ambiente
-        env_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), '.env')
-        load_dotenv(dotenv_path=env_path)
-
-        self.api_key = os.getenv("API_KEY")
-        self.base_url = os.getenv("URL_BAIXAR_XMLS")
+    def __init__(self, max_workers: int = 4, intervalo_requisicoes: float = 3.0,
+                 temp_dir: Optional[Union[str, os.PathLike]] = None):
+        self.api_key = API_KEY
+        self.base_url = URL_BAIXAR_XMLS
 
         if not self.api_key or not self.base_url:
-            logging.error("API_KEY ou URL_BAIXAR_XMLS não encontrados no arquivo .env.")
+            logger.error("API_KEY ou URL_BAIXAR_XMLS não encontrados no arquivo .env.")
             raise ValueError("API_KEY ou URL_BAIXAR_XMLS não encontrados no arquivo .env.")
+
+        # Diretório base dos downloads, resolvido uma única vez
+        self.temp_dir = os.fspath(temp_dir) if temp_dir is not None else os.path.join(os.getcwd(), "temp")
+
+        # Downloads concorrentes, respeitando um intervalo mínimo entre requisições
+        self.max_workers = max_workers
+        self.intervalo_requisicoes = intervalo_requisicoes
+        self._lock_requisicoes = threading.Lock()
+        self._proxima_requisicao = 0.0
+
+        # Parser de DF-e sem estado por documento, compartilhado entre itens e threads
+        self._parser = DocumentoFiscalParser()
+
+        # Hashes dos XMLs já salvos nesta execução: intervalos que se sobrepõem
+        # devolvem os mesmos documentos, que não precisam ser lidos de novo
+        self._conteudos_vistos = set()
+        self._lock_conteudos = threading.Lock()
+
+        # Diretórios já garantidos nesta execução, evita makedirs repetidos
+        self._diretorios_criados = set()
+
+        # Sessão HTTP reutilizada (keep-alive) por todas as requisições, com uma
+        # conexão por thread no pool. As repetições ficam em get_base64_data e não
+        # no urllib3, para que também respeitem o intervalo entre requisições. Os
+        # cabeçalhos padrão do requests já pedem keep-alive e anunciam todas as
+        # compressões que o urllib3 consegue descompactar
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
         
-        logging.info("API Handler inicializado com sucesso.")
+        logger.info("API Handler inicializado com sucesso.")
+
+    def close(self):
+        """
+        Encerra a sessão HTTP, liberando as conexões mantidas no pool.
+        """
+        self.session.close()
+
+    def __enter__(self):
+        return self
 
-    def _build_payload(self, xml_type: int, take: int = 50, skip: int = 0, 
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _build_payload(self, xml_type: int, take: int = ITENS_POR_PAGINA, skip: int = 0, 
                        data_emissao_inicio: Optional[datetime] = None, 
                        data_emissao_fim: Optional[datetime] = None) -> dict:
         """
@@ -60,62 +150,101 @@ class SiegApiHandler:
             "XmlType": xml_type,
             "Take": take,
             "Skip": skip,
-            "DataEmissaoInicio": data_emissao_inicio.strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z",
-            "DataEmissaoFim": data_emissao_fim.strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z",
+            "DataEmissaoInicio": _formatar_data_api(data_emissao_inicio),
+            "DataEmissaoFim": _formatar_data_api(data_emissao_fim),
             "Downloadevent": True
         }
-        logging.debug(f"Payload construído: {payload}")
+        logger.debug("Payload construído: %s", payload)
         return payload
 
     def get_base64_data(self, payload: dict) -> Optional[str]:
         """
         Faz uma chamada à API para obter os dados codificados em Base64.
+
+        A consulta é um POST sem efeitos colaterais: falhas de conexão e respostas
+        de STATUS_REPETIR são repetidas até TENTATIVAS_REQUISICAO vezes, sempre
+        aguardando o intervalo mínimo entre requisições.
         """
         url = f"{self.base_url}?api_key={self.api_key}"
-        logging.info(f"Enviando requisição para URL: {url}")
-        logging.info(f"Payload: {payload}")
+        logger.info("Enviando requisição para URL: %s", url)
+        logger.info("Payload: %s", payload)
 
         try:
-            response = requests.post(url, json=payload)
+            for tentativa in range(1, TENTATIVAS_REQUISICAO + 1):
+                self._aguardar_intervalo()
+                try:
+                    response = self.session.post(url, json=payload)
+                except (requests.ConnectionError, requests.Timeout) as e:
+                    if tentativa == TENTATIVAS_REQUISICAO:
+                        raise
+                    logger.warning("Falha de conexão com a API (tentativa %s de %s): %s",
+                                   tentativa, TENTATIVAS_REQUISICAO, e)
+                    continue
+                if response.status_code not in STATUS_REPETIR or tentativa == TENTATIVAS_REQUISICAO:
+                    break
+                logger.warning("API respondeu %s (tentativa %s de %s).",
+                               response.status_code, tentativa, TENTATIVAS_REQUISICAO)
             response.raise_for_status()
-            logging.info(f"Resposta recebida com sucesso: {response.status_code}")
-            return response.json()
+            logger.info("Resposta recebida com sucesso: %s", response.status_code)
+            return _json_loads(response.content)
         except requests.RequestException as e:
-            logging.error(f"Erro ao se comunicar com a API: {e}")
+            logger.error("Erro ao se comunicar com a API: %s", e)
+            return None
+        except ValueError as e:
+            logger.error("Resposta da API não é um JSON válido: %s", e)
             return None
 
-    def process_and_save_base64(self, json_data: Union[str, dict, list], output_dir: str):
+    def process_and_save_base64(self, json_data: Union[str, dict, list], output_dir: str) -> bool:
         """
         Processa o JSON contendo itens Base64 e salva os arquivos decodificados.
+
+        Returns:
+            bool: True se todos os itens foram salvos, já existiam em disco ou não
+            são gravados (documentos sem emitente, como os eventos de CT-e e MDF-e).
+            False se algum item não pôde ser decodificado, interpretado ou salvo.
         """
         try:
-            data = json.loads(json_data) if isinstance(json_data, str) else json_data
-            logging.info(f"Dados carregados para processamento. Total de itens: {len(data)}")
+            data = _json_loads(json_data) if isinstance(json_data, (str, bytes)) else json_data
+            logger.info("Dados carregados para processamento. Total de itens: %s", len(data))
         except json.JSONDecodeError:
-            logging.error("Dados fornecidos não são um JSON válido.")
+            logger.error("Dados fornecidos não são um JSON válido.")
             raise ValueError("Dados fornecidos não são um JSON válido.")
 
-        os.makedirs(output_dir, exist_ok=True)
+        self._garantir_diretorio(output_dir)
         #output_dir2 = output_dir+"eventos"
         #os.makedirs(output_dir+"\\eventos", exist_ok=True)
 
         contador = 1
+        completo = True
 
         for item in data:
             try:
 
                 local_dir = output_dir
-                #decoded_content = base64.b64decode(item)
-                texto_decodificado = base64.b64decode(item).decode('utf-8')
+                # Mantido em bytes: o parser identifica o encoding declarado no XML
+                # e o arquivo é gravado exatamente como veio da API
+                decoded_content = _b64decode(item)
+
+                digest = hashlib.blake2b(decoded_content, digest_size=16).digest()
+                if self._conteudo_repetido(digest):
+                    logger.debug("Documento repetido nesta execução, ignorando item %s.", contador)
+                    continue
+
+                resultado = self._parser.parse_documento_fiscal_bytes(decoded_content)
 
-                parserDFe = DocumentoFiscalParser()
-                resultado = parserDFe.parse_documento_fiscal_string(texto_decodificado)
+                if resultado is not None and "erro" in resultado:
+                    logger.error("Erro ao interpretar o item %s: %s", contador, resultado["erro"])
+                    completo = False
+                    continue
 
-                if "cnpj_emitente" in resultado :
-                    local_dir = f"{output_dir}\\{resultado["cnpj_emitente"]}"
-                    os.makedirs(local_dir, exist_ok=True)
-                    os.makedirs(local_dir+"\\eventos", exist_ok=True)
+                if resultado is not None and "cnpj_emitente" in resultado:
+                    local_dir = os.path.join(output_dir, resultado["cnpj_emitente"])
+                    eventos_dir = os.path.join(local_dir, "eventos")
+                    self._garantir_diretorio(local_dir)
+                    self._garantir_diretorio(eventos_dir)
                 else:
+                    # Documento sem emitente: não é gravado, por definição
+                    logger.debug("Documento sem emitente, ignorando item %s.", contador)
                     continue
 
                 #print(resultado)
@@ -123,46 +252,153 @@ class SiegApiHandler:
                 file_name = ""
                 if not isinstance(resultado, dict) or "erro" in resultado:
                     file_name = GerenciadorArquivos.gerar_nome_arquivo_temp(str(contador),"xml")
-                    logging.error(f"Arquivo sem parse: {file_name}")
+                    logger.error("Arquivo sem parse: %s", file_name)
                     #resultado['isevent'] = '1'
                 elif "isevent" in resultado:
                     if resultado['isevent'] == '1':
                         file_name = f"{resultado["chave_acesso"]}_{resultado["tipo_documento"]}_{resultado["tipo_evento"]}_{resultado["sequencia_evento"]}.xml"
-                        file_path = os.path.join(local_dir+"\\eventos", file_name)
+                        file_path = os.path.join(eventos_dir, file_name)
                     else:
-                        file_name = file_name = f"{resultado["chave_acesso"]}_{resultado["tipo_documento"]}.xml"
-                        file_path = os.path.jodin(local_dir, file_name)
+                        file_name = f"{resultado["chave_acesso"]}_{resultado["tipo_documento"]}.xml"
+                        file_path = os.path.join(local_dir, file_name)
                 else:
-                    file_name = file_name = f"{resultado["chave_acesso"]}_{resultado["tipo_documento"]}.xml"
+                    file_name = f"{resultado["chave_acesso"]}_{resultado["tipo_documento"]}.xml"
                     file_path = os.path.join(local_dir, file_name)
                 try:
-
+                    # Arquivo já baixado em execução anterior (um único stat)
+                    try:
+                        info = os.stat(file_path)
+                        if stat.S_ISREG(info.st_mode) and info.st_size > 0:
+                            logger.info("Arquivo já existe, ignorando: %s", file_path)
+                            self._registrar_conteudo(digest)
+                            continue
+                    except FileNotFoundError:
+                        pass
+
+                    # Escrita com buffer: o BufferedWriter repete o write até gravar todo o conteúdo
                     with open(file_path, "wb") as xml_file:
-                        xml_file.write(texto_decodificado.encode("utf-8"))
-                    logging.info(f"Arquivo salvo com sucesso: {file_path}")
+                        xml_file.write(decoded_content)
+                    logger.info("Arquivo salvo com sucesso: %s", file_path)
+                    self._registrar_conteudo(digest)
                     contador += 1
                 except OSError as e:
-                    logging.error(f"Erro ao salvar o arquivo: {e}")
+                    logger.error("Erro ao salvar o arquivo: %s", e)
+                    completo = False
                     #logging.error(f"Erro ao salvar o arquivo: {xml_file}")
             except (base64.binascii.Error, TypeError) as e:
                 # Registrar o tipo de erro e a mensagem associada
-                logging.warning(f"Erro ao decodificar o item na posição {contador}: {type(e).__name__} - {e}")
+                logger.warning("Erro ao decodificar o item na posição %s: %s - %s", contador, type(e).__name__, e)
+                completo = False
 
+        return completo
+
+    def _conteudo_repetido(self, digest: bytes) -> bool:
+        """
+        Informa se um conteúdo com este hash já foi salvo nesta execução.
+        """
+        with self._lock_conteudos:
+            return digest in self._conteudos_vistos
+
+    def _registrar_conteudo(self, digest: bytes):
+        """
+        Registra o hash de um conteúdo já gravado (ou já existente) em disco.
+        """
+        with self._lock_conteudos:
+            self._conteudos_vistos.add(digest)
+
+    def _garantir_diretorio(self, caminho: str):
+        """
+        Cria o diretório apenas na primeira vez em que ele é solicitado.
+        """
+        if caminho not in self._diretorios_criados:
+            os.makedirs(caminho, exist_ok=True)
+            self._diretorios_criados.add(caminho)
+
+    def _aguardar_intervalo(self):
+        """
+        Aguarda o intervalo mínimo entre requisições, compartilhado entre as threads.
+        """
+        with self._lock_requisicoes:
+            agora = time.monotonic()
+            espera = self._proxima_requisicao - agora
+            if espera > 0:
+                time.sleep(espera)
+                agora += espera
+            self._proxima_requisicao = agora + self.intervalo_requisicoes
+
+    def _baixar_intervalo(self, xml_type: XmlType, data_hora_inicio: datetime,
+                          data_hora_fim: datetime, output_dir: str) -> bool:
+        """
+        Baixa e salva os arquivos XML de um tipo para um intervalo de horário,
+        consultando páginas de ITENS_POR_PAGINA documentos até a última.
+
+        Returns:
+            bool: True se todas as páginas foram respondidas pela API e todos os
+            documentos do intervalo foram salvos (ou já existiam em disco).
+        """
+        completo = True
+        skip = 0
+        while True:
+            payload = self._build_payload(xml_type.value, skip=skip, data_emissao_inicio=data_hora_inicio, data_emissao_fim=data_hora_fim)
+            logger.info("Payload para %s: %s", xml_type.name, payload)
+
+            base64_data = self.get_base64_data(payload)
+            if base64_data is None:
+                return False
+            # A API devolve a lista de itens dentro de uma string JSON; decodificada
+            # aqui para que o tamanho da página conte itens, e não caracteres
+            if isinstance(base64_data, (str, bytes)):
+                try:
+                    base64_data = _json_loads(base64_data)
+                except ValueError as e:
+                    logger.error("Resposta da API não é uma lista JSON válida: %s", e)
+                    return False
+            if not base64_data:
+                if skip == 0:
+                    logger.info("Nenhum dado encontrado para %s e %s e tipo %s.", data_hora_inicio, data_hora_fim, xml_type.name)
+                return completo
+
+            if not self.process_and_save_base64(base64_data, output_dir):
+                completo = False
+            # Página incompleta: não há mais documentos no intervalo
+            if len(base64_data) < ITENS_POR_PAGINA:
+                return completo
+            skip += ITENS_POR_PAGINA
 
     def download_xmls(self, start_date: datetime, end_date: datetime):
         """
         Faz o download dos arquivos XML para o intervalo de datas fornecido.
+
+        Cada combinação de dia, tipo de XML e intervalo de horário é baixada
+        em paralelo por um pool de threads. Dias anteriores ao atual cujos
+        intervalos foram todos baixados e salvos recebem o marcador ARQUIVO_CONCLUIDO
+        e não são consultados novamente.
         """
+        if end_date < start_date:
+            logger.warning("Período inválido: %s é posterior a %s.", start_date, end_date)
+            return
+
+        hoje = datetime.now().date()
+        tarefas = []
+        # Intervalos ainda não concluídos de cada pasta que pode ser marcada como concluída
+        pendentes = {}
         for day_offset in range((end_date - start_date).days + 1):
             current_date = start_date + timedelta(days=day_offset)
-            logging.info(f"Processando dia {current_date}...")
+            logger.info("Processando dia %s...", current_date)
 
             main_dir = os.path.join(
-                os.getcwd(), "temp", str(current_date.year), 
+                self.temp_dir, str(current_date.year), 
                 f"{current_date.month:02}", f"{current_date.day:02}"
             )
 
-            os.makedirs(main_dir, exist_ok=True)
+            self._garantir_diretorio(main_dir)
+
+            # Os mesmos intervalos do dia servem para todos os tipos de XML
+            intervalos = [
+                (current_date.replace(hour=inicio, minute=0, second=0),
+                 current_date.replace(hour=fim, minute=59, second=59))
+                for inicio, fim in INTERVALOS_HORARIOS
+            ]
 
             for xml_type in XmlType:
 
@@ -170,34 +406,46 @@ class SiegApiHandler:
                 #     continue
 
                 output_dir = os.path.join(main_dir, xml_type.name)
-                os.makedirs(output_dir, exist_ok=True)
-
-                # Início do horário em 00:00
-                hora_atual = datetime.strptime("00:00", "%H:%M")
-                intervalo2 = timedelta(hours=2) ## NA VERDADE SÃO 2, MINUTOS=59 SEGUNDOS=59
-                intervalo1 = timedelta(hours=1)
-
-                # Laço para gerar 12 intervalos
-                for i in range(12):
-                    #hora_inicio = hora_atual.strptime("00:00", "%H:%M")  # Formata a hora de início
-                    #hora_fim = (hora_atual + intervalo - timedelta(minutes=1)).strptime("00:00", "%H:%M")  # Hora final ajustada para 23:59 no último minuto
-                    #logging.info(f"Intervalo {i+1}: {hora_inicio} - {hora_fim}")
-
-                    # Concatena as horas à data_base usando replace
-                    data_hora_inicio = current_date.replace(hour=hora_atual.hour, minute=hora_atual.minute, second=0)
-                    data_hora_fim = current_date.replace(hour=(hora_atual + intervalo1).hour, minute=59, second=59)
-    
-                    payload = self._build_payload(xml_type.value, data_emissao_inicio=data_hora_inicio, data_emissao_fim=data_hora_fim)
-                    logging.info(f"Payload para {xml_type.name}: {payload}")
-
-                    time.sleep(3)
-                    base64_data = self.get_base64_data(payload)
-                    if base64_data:
-                        self.process_and_save_base64(base64_data, output_dir)
-                    else:
-                        logging.info(f"Nenhum dado encontrado para {data_hora_inicio} e {data_hora_fim} e tipo {xml_type.name}.")
+                if os.path.exists(os.path.join(output_dir, ARQUIVO_CONCLUIDO)):
+                    logger.info("Dia %s e tipo %s já baixados, ignorando.", current_date.date(), xml_type.name)
+                    continue
+                self._garantir_diretorio(output_dir)
+
+                # O dia atual ainda pode receber documentos, então nunca é marcado
+                if current_date.date() < hoje:
+                    pendentes[output_dir] = len(intervalos)
+
+                for data_hora_inicio, data_hora_fim in intervalos:
+                    tarefas.append((xml_type, data_hora_inicio, data_hora_fim, output_dir))
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futuros = [executor.submit(self._baixar_intervalo, *tarefa) for tarefa in tarefas]
+            for tarefa, futuro in zip(tarefas, futuros):
+                try:
+                    sucesso = futuro.result()
+                except Exception as e:
+                    logger.exception("Erro ao baixar intervalo: %s", e)
+                    sucesso = False
 
-                    # Incrementa o horário em 2 horas
-                    hora_atual += intervalo2
+                output_dir = tarefa[3]
+                if output_dir not in pendentes:
+                    continue
+                if not sucesso:
+                    # Uma falha impede a marcação da pasta nesta execução
+                    del pendentes[output_dir]
+                    continue
+                pendentes[output_dir] -= 1
+                if pendentes[output_dir] == 0:
+                    self._marcar_concluido(output_dir)
+
+    def _marcar_concluido(self, output_dir: str):
+        """
+        Grava o marcador de pasta concluída.
+        """
+        try:
+            open(os.path.join(output_dir, ARQUIVO_CONCLUIDO), "w").close()
+            logger.info("Download concluído: %s", output_dir)
+        except OSError as e:
+            logger.error("Erro ao gravar o marcador de conclusão em %s: %s", output_dir, e)
 
 
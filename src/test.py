@@ -1,5 +1,6 @@
 import base64
 import os
+import re
 from pathlib import Path
 
 # Obter o diretório atual como um objeto Path
@@ -33,22 +34,11 @@ decoded_data = base64.b64decode(base64_content)
 # e cada XML começa com a tag '<?xml' (ou similar), você pode usar isso como base para separar.
 # Vamos procurar por essa tag para dividir os arquivos.
 
-xmls = []
-start_idx = 0
-
-# Dividir os arquivos baseando na tag '<?xml'
-while True:
-    start_idx = decoded_data.find(b'<nfeProc', start_idx)
-    if start_idx == -1:
-        break
-    
-    end_idx = decoded_data.find(b'</nfeProc>', start_idx)  # Ajuste de acordo com a tag final do XML
-    if end_idx == -1:
-        break
-    
-    xml_data = decoded_data[start_idx:end_idx + len('</nfeProc>')]  # Extrair o XML completo
-    xmls.append(xml_data)
-    start_idx = end_idx
+# Cada XML vai de <nfeProc ...> até o </nfeProc> seguinte (\b evita casar outras tags
+# com o mesmo prefixo). A busca inteira roda no motor de regex, em uma única passada
+PADRAO_NFE_PROC = re.compile(rb'<nfeProc\b.*?</nfeProc>', re.DOTALL)
+
+xmls = PADRAO_NFE_PROC.findall(decoded_data)
 
 # Salvar cada XML em um arquivo separado
 for i, xml_data in enumerate(xmls):
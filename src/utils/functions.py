@@ -1,13 +1,14 @@
 import logging
+import os
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterator, Optional, Union
 from dataclasses import dataclass
 import hashlib
 import time
 
-# Configuração do logging
+# Configuração do logging; valores de LOGLEVEL desconhecidos usam INFO
 logging.basicConfig(
-    level=logging.INFO,
+    level=logging.getLevelNamesMapping().get(os.getenv("LOGLEVEL", "INFO").upper(), logging.INFO),
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 logger = logging.getLogger(__name__)
@@ -24,26 +25,27 @@ class GerenciadorArquivos:
     """Classe para gerenciamento e análise de arquivos em diretórios."""
     
     @staticmethod
-    def obter_info_arquivo(caminho: Path) -> Optional[ArquivoInfo]:
+    def obter_info_arquivo(caminho: Union[Path, os.DirEntry]) -> Optional[ArquivoInfo]:
         """
         Obtém informações de um arquivo específico.
         
         Args:
-            caminho: Path do arquivo a ser analisado
+            caminho: Path ou DirEntry (do os.scandir) do arquivo a ser analisado.
+                Com DirEntry, o tamanho vem do stat já obtido na listagem.
         
         Returns:
             ArquivoInfo se sucesso, None se falhar
         """
         try:
-            nome = caminho.stem
+            nome, extensao = os.path.splitext(caminho.name)
             return ArquivoInfo(
                 nome=nome,
-                caminho_completo=str(caminho),
-                extensao=caminho.suffix.lstrip('.'),
+                caminho_completo=os.fspath(caminho),
+                extensao=extensao.lstrip('.'),
                 tamanho=caminho.stat().st_size
             )
         except OSError as e:
-            logger.error(f"Erro ao processar arquivo {caminho}: {e}")
+            logger.error("Erro ao processar arquivo %s: %s", caminho, e)
             return None
 
     @staticmethod
@@ -63,6 +65,33 @@ class GerenciadorArquivos:
         if not diretorio.is_dir():
             raise ValueError(f"O caminho especificado não é um diretório: {diretorio}")
 
+    @staticmethod
+    def _scandir_arquivos(diretorio: str) -> Iterator[os.DirEntry]:
+        """
+        Percorre o diretório e suas subpastas com os.scandir, gerando os arquivos.
+
+        Os arquivos de cada pasta vêm antes dos das subpastas, como no rglob.
+        As pastas ficam em uma pilha, sem recursão. Links simbólicos para pastas
+        não são seguidos e pastas que não podem ser listadas são ignoradas.
+        """
+        pendentes = [diretorio]
+        while pendentes:
+            pasta = pendentes.pop()
+            subpastas = []
+            try:
+                with os.scandir(pasta) as entradas:
+                    for entrada in entradas:
+                        if entrada.is_dir(follow_symlinks=False):
+                            subpastas.append(entrada.path)
+                        elif entrada.is_file():
+                            yield entrada
+            except OSError as e:
+                logger.warning("Não foi possível listar o diretório %s: %s", pasta, e)
+                continue
+
+            # Invertidas para que a pilha as visite na ordem da listagem
+            pendentes.extend(reversed(subpastas))
+
     @staticmethod
     def listar_arquivos_by_path(diretorio: str) -> Dict[str, Dict[str, Any]]:
         """
@@ -83,22 +112,21 @@ class GerenciadorArquivos:
         arquivos_info: Dict[str, Dict[str, Any]] = {}
         
         try:
-            for arquivo_path in caminho.rglob('*'):
-                if arquivo_path.is_file():
-                    info = GerenciadorArquivos.obter_info_arquivo(arquivo_path)
-                    if info:
-                        arquivos_info[arquivo_path.name] = {
-                            'nome': info.nome,
-                            'caminho_completo': info.caminho_completo,
-                            'extensao': info.extensao,
-                            'tamanho': info.tamanho
-                        }
+            for entrada in GerenciadorArquivos._scandir_arquivos(str(caminho)):
+                info = GerenciadorArquivos.obter_info_arquivo(entrada)
+                if info:
+                    arquivos_info[entrada.name] = {
+                        'nome': info.nome,
+                        'caminho_completo': info.caminho_completo,
+                        'extensao': info.extensao,
+                        'tamanho': info.tamanho
+                    }
             
-            logger.info(f"Processados {len(arquivos_info)} arquivos em {diretorio}")
+            logger.info("Processados %s arquivos em %s", len(arquivos_info), diretorio)
             return arquivos_info
         
         except Exception as e:
-            logger.error(f"Erro ao processar diretório {diretorio}: {e}")
+            logger.error("Erro ao processar diretório %s: %s", diretorio, e)
             raise
 
     @staticmethod
@@ -126,12 +154,12 @@ class GerenciadorArquivos:
         Returns:
             Nome do arquivo com o hash.
         """
-        # Combine a string base com o timestamp atual
-        dados = f"{base}_{time.time()}".encode("utf-8")
+        # Combine a string base com o timestamp atual (em nanossegundos, sem formatar float)
+        dados = f"{base}_{time.time_ns()}".encode("utf-8")
         
-        # Gere um hash SHA-256 a partir dos dados
-        hash_obj = hashlib.sha256(dados)
-        hash_str = hash_obj.hexdigest()  # Convertendo para hexadecimal
+        # Gere um hash BLAKE2b de 128 bits a partir dos dados: mais rápido que o
+        # SHA-256 e suficiente para um nome único (32 caracteres hexadecimais)
+        hash_str = hashlib.blake2b(dados, digest_size=16).hexdigest()
         
         # Retorne o nome do arquivo com o hash
         return f"temp_{hash_str}.{extensao}"
@@ -155,30 +183,16 @@ class StringUtils:
 
         # Verificar se char1 e char2 são de fato caracteres individuais
         if len(char1) != 1 or len(char2) != 1:
-            logging.error("Os parâmetros 'char1' e 'char2' devem ser caracteres individuais.")
+            logger.error("Os parâmetros 'char1' e 'char2' devem ser caracteres individuais.")
             return texto
         
-        # Verifica se os caracteres existem no texto
-        if char1 not in texto:
-            logging.info(f"Caractere '{char1}' não encontrado no texto.")
-        if char2 not in texto:
-            logging.info(f"Caractere '{char2}' não encontrado no texto.")
-
-        try:
-            # Encontrar os índices das ocorrências dos caracteres
-            try:
-                indice1 = texto.find(char1)
-                indice2 = texto.rfind(char2)
-            except Exception as e:
-                return texto
-            
-
-            # Retorna a substring entre char1 e char2 (inclusive)
-            return texto[indice1:indice2 + 1]
-        
-        except Exception as e:
-            # Loga o erro caso um dos caracteres não seja encontrado
-            logging.error(f"Erro ao procurar os caracteres '{char1}' e '{char2}' na string: {e}")
-            # Retorna a string original
+        # Uma única busca em cada sentido: find/rfind já indicam a ausência com -1
+        indice1 = texto.find(char1)
+        indice2 = texto.rfind(char2)
+        if indice1 < 0 or indice2 < 0:
+            logger.info("Caracteres '%s' e '%s' não encontrados no texto.", char1, char2)
             return texto
 
+        # Retorna a substring entre char1 e char2 (inclusive)
+        return texto[indice1:indice2 + 1]
+
@@ -0,0 +1,182 @@
+import base64
+import json
+import logging
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+NFE_XML = (
+    '<?xml version="1.0" encoding="UTF-8"?>'
+    '<nfeProc xmlns="http://www.portalfiscal.inf.br/nfe" versao="4.00"><NFe xmlns="http://www.portalfiscal.inf.br/nfe">'
+    '<infNFe Id="NFe51241228509770000183550010000085291246835167" versao="4.00">'
+    '<ide><cUF>51</cUF><nNF>8529</nNF><dhEmi>2024-12-11T10:20:30-03:00</dhEmi></ide>'
+    '<emit><CNPJ>28509770000183</CNPJ><xNome>EMPRESA ÇÃO</xNome></emit>'
+    '<dest><CPF>12345678901</CPF><xNome>Fulano</xNome><enderDest><xMun>Cuiabá</xMun></enderDest></dest>'
+    '<total><ICMSTot><vBC>100.00</vBC><vICMS>17.00</vICMS><vST>0.00</vST><vBCST>0.00</vBCST>'
+    '<vPIS>1.65</vPIS><vCOFINS>7.60</vCOFINS><vNF>117.00</vNF></ICMSTot></total></infNFe></NFe>'
+    '<protNFe versao="4.00"><infProt><chNFe>51241228509770000183550010000085291246835167</chNFe>'
+    '<nProt>151240000000001</nProt><cStat>100</cStat></infProt></protNFe></nfeProc>'
+).encode("utf-8")
+
+PROC_EVENTO_CTE_XML = (
+    '<?xml version="1.0" encoding="UTF-8"?>'
+    '<procEventoCTe xmlns="http://www.portalfiscal.inf.br/cte" versao="4.00"><eventoCTe versao="4.00">'
+    '<infEvento Id="ID110111512412285097700001835700100000000110000000170"><cOrgao>51</cOrgao>'
+    '<CNPJ>28509770000183</CNPJ><chCTe>51241228509770000183570010000000011000000017</chCTe>'
+    '<dhEvento>2024-12-12T10:00:00-03:00</dhEvento><tpEvento>110111</tpEvento><nSeqEvento>1</nSeqEvento>'
+    '<detEvento versaoEvento="4.00"><evCancCTe><descEvento>Cancelamento</descEvento></evCancCTe></detEvento>'
+    '</infEvento></eventoCTe><retEventoCTe versao="4.00"><infEvento><cStat>135</cStat>'
+    '<xMotivo>Evento registrado</xMotivo><nProt>351240000000009</nProt>'
+    '<dhRegEvento>2024-12-12T10:00:05-03:00</dhRegEvento></infEvento></retEventoCTe></procEventoCTe>'
+).encode("utf-8")
+
+
+def setUpModule():
+    global sieg
+    # O módulo grava o sieg_api.log no diretório atual ao ser importado
+    cwd = os.getcwd()
+    os.chdir(tempfile.mkdtemp())
+    try:
+        import sieg.SiegApiHandler as sieg
+    finally:
+        os.chdir(cwd)
+    logging.disable(logging.CRITICAL)
+
+
+def tearDownModule():
+    logging.disable(logging.NOTSET)
+
+
+class _Resposta:
+
+    def __init__(self, itens, status_code=200):
+        # A API devolve uma string JSON com a lista de itens Base64
+        self.content = json.dumps(json.dumps(itens)).encode()
+        self.status_code = status_code
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise sieg.requests.HTTPError(f"{self.status_code}")
+
+
+class _SessaoFalsa:
+    """
+    Devolve os itens informados para (XmlType, DataEmissaoInicio, Skip) e listas vazias no resto.
+    """
+
+    def __init__(self, respostas):
+        self.respostas = respostas
+        self.payloads = []
+        self._lock = threading.Lock()
+
+    def post(self, url, json=None, **kwargs):
+        with self._lock:
+            self.payloads.append(json)
+        chave = (json["XmlType"], json["DataEmissaoInicio"], json["Skip"])
+        return _Resposta(self.respostas.get(chave, []))
+
+    def close(self):
+        pass
+
+
+class TestDownloadXmls(unittest.TestCase):
+
+    def setUp(self):
+        self._originais = (sieg.API_KEY, sieg.URL_BAIXAR_XMLS)
+        sieg.API_KEY, sieg.URL_BAIXAR_XMLS = "chave", "http://sieg.invalid/BaixarXmls"
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        sieg.API_KEY, sieg.URL_BAIXAR_XMLS = self._originais
+        self.temp_dir.cleanup()
+
+    def _baixar(self, respostas):
+        sessao = _SessaoFalsa(respostas)
+        with sieg.SiegApiHandler(intervalo_requisicoes=0, temp_dir=self.temp_dir.name) as handler:
+            handler.session.close()
+            handler.session = sessao
+            dia = datetime(2025, 1, 1)
+            handler.download_xmls(dia, dia)
+        return sessao
+
+    def test_evento_sem_emitente_nao_impede_conclusao(self):
+        itens = [base64.b64encode(xml).decode() for xml in (NFE_XML, PROC_EVENTO_CTE_XML)]
+        sessao = self._baixar({(sieg.XmlType.NFE.value, "2025-01-01T00:00:00.000Z", 0): itens})
+
+        dia_dir = os.path.join(self.temp_dir.name, "2025", "01", "01")
+        for xml_type in sieg.XmlType:
+            with self.subTest(xml_type=xml_type.name):
+                self.assertTrue(os.path.exists(os.path.join(dia_dir, xml_type.name, sieg.ARQUIVO_CONCLUIDO)))
+        self.assertTrue(os.path.exists(os.path.join(
+            dia_dir, "NFE", "28509770000183", "51241228509770000183550010000085291246835167_NF-e.xml")))
+
+        # Uma única página por intervalo: 12 intervalos para cada um dos 5 tipos
+        self.assertEqual(len(sessao.payloads), len(sieg.INTERVALOS_HORARIOS) * len(sieg.XmlType))
+
+    def test_pagina_cheia_consulta_proxima(self):
+        itens = [base64.b64encode(NFE_XML).decode()]
+        inicio = "2025-01-01T00:00:00.000Z"
+        sessao = self._baixar({
+            (sieg.XmlType.NFE.value, inicio, 0): itens * sieg.ITENS_POR_PAGINA,
+            (sieg.XmlType.NFE.value, inicio, sieg.ITENS_POR_PAGINA): itens,
+        })
+
+        skips = [p["Skip"] for p in sessao.payloads
+                 if p["XmlType"] == sieg.XmlType.NFE.value and p["DataEmissaoInicio"] == inicio]
+        self.assertEqual(skips, [0, sieg.ITENS_POR_PAGINA])
+
+
+class TestGetBase64Data(unittest.TestCase):
+
+    def setUp(self):
+        self._originais = (sieg.API_KEY, sieg.URL_BAIXAR_XMLS)
+        sieg.API_KEY, sieg.URL_BAIXAR_XMLS = "chave", "http://sieg.invalid/BaixarXmls"
+        self.handler = sieg.SiegApiHandler(intervalo_requisicoes=0)
+        self.handler.session.close()
+        self.esperas = 0
+        self.handler._aguardar_intervalo = self._contar_espera
+
+    def tearDown(self):
+        sieg.API_KEY, sieg.URL_BAIXAR_XMLS = self._originais
+
+    def _contar_espera(self):
+        self.esperas += 1
+
+    def _responder(self, *respostas):
+        fila = list(respostas)
+
+        class Sessao:
+            def post(self, url, json=None, **kwargs):
+                resposta = fila.pop(0)
+                if isinstance(resposta, Exception):
+                    raise resposta
+                return resposta
+
+        self.handler.session = Sessao()
+
+    def test_repete_status_temporario_pelo_limitador(self):
+        self._responder(_Resposta([], 503), sieg.requests.ConnectionError("queda"), _Resposta(["item"]))
+
+        self.assertEqual(self.handler.get_base64_data({}), json.dumps(["item"]))
+        self.assertEqual(self.esperas, 3)
+
+    def test_desiste_apos_todas_as_tentativas(self):
+        self._responder(*[_Resposta([], 429) for _ in range(sieg.TENTATIVAS_REQUISICAO)])
+
+        self.assertIsNone(self.handler.get_base64_data({}))
+        self.assertEqual(self.esperas, sieg.TENTATIVAS_REQUISICAO)
+
+    def test_nao_repete_erro_do_cliente(self):
+        self._responder(_Resposta([], 400))
+
+        self.assertIsNone(self.handler.get_base64_data({}))
+        self.assertEqual(self.esperas, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()